@@ -17,6 +17,7 @@ class BaseAttack(ABC):
         self.owner = owner
         self.cooldown = 0
         self.last_attack_time = 0
+        self.projectiles = []  # Proyectiles activos; los dibuja EnemyManager junto a los demás
 
     @abstractmethod
     def update(self):
@@ -26,18 +27,6 @@ class BaseAttack(ABC):
         """
         pass
 
-    @abstractmethod
-    def draw(self, screen, camera_x, camera_y):
-        """
-        Método abstracto para dibujar el ataque en pantalla.
-        Debe ser implementado por las clases hijas.
-        Parámetros:
-        - screen: Superficie donde dibujar
-        - camera_x: Posición X de la cámara
-        - camera_y: Posición Y de la cámara
-        """
-        pass
-
     def can_attack(self):
         """
         Verifica si el ataque puede ser realizado basado en el tiempo de cooldown.
@@ -79,7 +68,6 @@ class FireballAttack(BaseAttack):
         self.cooldown = 1000  # 1 segundo de cooldown
         self.damage = 20
         self.game = game
-        self.projectiles = []
         self.enemy_manager = enemy_manager  # Referencia al EnemyManager
         self.detection_radius = 170
     def update(self):
@@ -91,17 +79,6 @@ class FireballAttack(BaseAttack):
             if projectile.update(self.owner, self.enemy_manager):
                 self.projectiles.remove(projectile)
 
-    def draw(self, screen, camera_x, camera_y):
-        """
-        Dibuja todos los proyectiles de bola de fuego activos.
-        Parámetros:
-        - screen: Superficie donde dibujar
-        - camera_x: Posición X de la cámara
-        - camera_y: Posición Y de la cámara
-        """
-        for projectile in self.projectiles:
-            projectile.draw(screen, camera_x, camera_y)
-
     def perform_attack(self):
         """
         Ejecuta el ataque de bola de fuego.
@@ -80,5 +80,6 @@ class EnemyProjectile(SpriteObject):
         - True si el proyectil está fuera de los límites del mapa definidos por settings
         - False si el proyectil está dentro de los límites del mapa
         """
-        return (self.rect.centerx < 0 or self.rect.centerx > self.settings.map_width * self.settings.tile_size or
-                self.rect.centery < 0 or self.rect.centery > self.settings.map_height * self.settings.tile_size)
\ No newline at end of file
+        left, top, right, bottom = self.game.tilemap.pixel_bounds()
+        return (self.rect.centerx < left or self.rect.centerx > right or
+                self.rect.centery < top or self.rect.centery > bottom)
\ No newline at end of file
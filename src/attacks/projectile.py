@@ -104,8 +104,9 @@ class Projectile(AnimatedSprite):
         Retorna:
         - True si el proyectil está fuera de los límites del mapa
         """
-        return (self.rect.centerx < 0 or self.rect.centerx > self.settings.map_width * self.settings.tile_size or
-                self.rect.centery < 0 or self.rect.centery > self.settings.map_height * self.settings.tile_size)
+        left, top, right, bottom = self.game.tilemap.pixel_bounds()
+        return (self.rect.centerx < left or self.rect.centerx > right or
+                self.rect.centery < top or self.rect.centery > bottom)
     
     def reset(self, settings, animation_manager, position, target_position, damage, speed, target_type, animation_name):
         """
@@ -10,9 +10,12 @@ from utils.profiler import Profiler
 from screens.level_up_screen import LevelUpScreen
 from managers.music_player import MusicPlayer
 from world.tilemap import TileMap
+from world.map_preloader import MapPreloader
 from managers.enemy_manager import EnemyManager
 from managers.ui_manager import UIManager
 from managers.animation_manager import AnimationManager
+from managers.asset_manager import AssetManager
+from managers.render_queue import RenderQueue
 from screens.game_over_screen import GameOverScreen
 import random
 
@@ -53,6 +56,9 @@ class Game:
             "spawn_rate": 0,
             "collision_time": 0,
             "pathfinding_time": 0,
+            "ai_budget_utilization": 0,
+            "ai_max_staleness": 0,
+            "ai_forced_plans": 0,
             "enemy_render_time": 0,
             "spatial_grid_time": 0
         }
@@ -68,9 +74,14 @@ class Game:
             radius = random.randint(1, 3)
             self.stars.append([x, y, radius, random.randint(0, 255)])
         
-        # Superficie de renderizado intermedia
-        self.render_surface = pygame.Surface(
-            (self.settings.screen_width, self.settings.screen_height))
+        # Superficie de renderizado (la propia ventana si tiene el tamaño lógico)
+        self.render_surface = None
+        self.present_surface = None  # Destino preasignado del escalado a la ventana
+        self.present_rect = None
+        self.update_render_target()
+
+        # Cola de renderizado de entidades (ordenadas por profundidad y dibujadas en bloque)
+        self.render_queue = RenderQueue(self.settings)
 
         # Mostrar pantalla de carga
         self.show_loading_screen()
@@ -80,13 +91,14 @@ class Game:
         self.game_state = GameState(self)
         self.log("GameState inicializado")
 
+        AssetManager.scaled_budget = self.settings.scaled_sprite_cache_mb * 1024 * 1024
+
         self.log("Inicializando AnimationManager...")
         self.animation_manager = AnimationManager(self.settings, self)
         self.log("AnimationManager inicializado")
 
         self.log("Inicializando TileMap...")
-        self.tilemap = TileMap(self.settings)
-        self.tilemap.generate()
+        self.tilemap = self.create_tilemap()
         self.log("TileMap inicializado")
 
         self.log("Inicializando EnemyManager...")
@@ -105,6 +117,20 @@ class Game:
         self.log("Juego inicializado correctamente")
         
 
+    def create_tilemap(self):
+        """
+        Obtiene el mapa de la partida.
+        Usa el generado en segundo plano durante el menú o el Game Over
+        si existe, y si no lo genera en el momento.
+        Retorna:
+        - TileMap generado
+        """
+        tilemap = MapPreloader.take(self.settings)
+        if tilemap is None:
+            tilemap = TileMap(self.settings)
+            tilemap.generate()
+        return tilemap
+
     def log(self, message):
         """
         Registra mensajes en la consola y actualiza la pantalla de carga.
@@ -114,6 +140,46 @@ class Game:
         print(message)
         self.show_loading_screen()
 
+    def update_render_target(self):
+        """
+        Prepara la superficie de renderizado según el tamaño de la ventana.
+        Si la ventana tiene el tamaño lógico (screen_width x screen_height), como
+        ocurre siempre con pygame.SCALED, se dibuja directamente en ella.
+        Si no, se renderiza en una superficie intermedia y se preasigna el destino
+        del escalado: factor entero (vecino más cercano) si la ventana es mayor,
+        o reducción proporcional si es menor, centrado con bandas negras.
+        Se llama al crear el juego y al redimensionar la ventana.
+        """
+        self.screen = pygame.display.get_surface() or self.screen
+        logical_size = (self.settings.screen_width, self.settings.screen_height)
+        window_width, window_height = self.screen.get_size()
+        if (window_width, window_height) == logical_size:
+            self.render_surface = self.screen
+            self.present_surface = None
+            self.present_rect = None
+            return
+
+        if self.render_surface is None or self.render_surface is self.screen:
+            self.render_surface = pygame.Surface(logical_size)
+        factor = min(window_width / logical_size[0], window_height / logical_size[1])
+        if factor >= 1:
+            factor = int(factor)
+        size = (max(1, int(logical_size[0] * factor)), max(1, int(logical_size[1] * factor)))
+        self.present_surface = pygame.Surface(size, 0, self.screen)
+        self.present_rect = self.present_surface.get_rect(center=(window_width // 2, window_height // 2))
+        self.screen.fill((0, 0, 0))
+
+    def present(self):
+        """
+        Muestra el frame renderizado en la ventana.
+        Si se dibuja directamente en la ventana solo hace flip; si no, escala
+        la superficie de renderizado al destino preasignado sin crear superficies.
+        """
+        if self.present_surface is not None:
+            pygame.transform.scale(self.render_surface, self.present_rect.size, self.present_surface)
+            self.screen.blit(self.present_surface, self.present_rect)
+        pygame.display.flip()
+
     def show_loading_screen(self):
         """
         Muestra la pantalla de carga con animación de estrellas.
@@ -142,6 +208,7 @@ class Game:
         - Eventos de cierre de ventana
         - Teclas de depuración (F1, F2, F3, H, L)
         - Tecla de reinicio (R)
+        - Zoom (rueda del ratón, + y -)
         - Entrada del jugador
         Retorna:
         - True si el juego debe continuar
@@ -153,7 +220,15 @@ class Game:
                     print("Evento de salida detectado")
                     self.game_state.is_game_over = True
                     return False
+                if event.type == pygame.VIDEORESIZE:
+                    self.update_render_target()
+                if event.type == pygame.MOUSEWHEEL and event.y:
+                    self.change_zoom(1 if event.y > 0 else -1)
                 if event.type == pygame.KEYDOWN:
+                    if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                        self.change_zoom(1)
+                    if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        self.change_zoom(-1)
                     if event.key == pygame.K_r:
                         print("Reiniciando juego...")
                         self.restart_game()
@@ -175,6 +250,21 @@ class Game:
             print(f"Error manejando eventos: {e}")
             return False
         
+    def change_zoom(self, step):
+        """
+        Pasa al zoom permitido siguiente o anterior.
+        Parámetros:
+        - step: 1 para acercar, -1 para alejar
+        El mapa no se regenera: los tiles, prefabs y sprites de cada zoom
+        se escalan una vez y se reutilizan desde sus cachés.
+        """
+        levels = self.settings.zoom_levels
+        current = min(range(len(levels)), key=lambda i: abs(levels[i] - self.settings.zoom))
+        index = max(0, min(len(levels) - 1, current + step))
+        if levels[index] != self.settings.zoom:
+            self.tilemap.set_zoom(levels[index])
+            self.tilemap.update_camera(self.player.rect.centerx, self.player.rect.centery)
+
     def run(self):
         """
         Bucle principal del juego.
@@ -206,6 +296,8 @@ class Game:
                 self.clock.tick(self.settings.FPS)
                 
                 if self.game_state.is_game_over:
+                    # Generar el mapa de la próxima partida mientras se muestra el Game Over
+                    MapPreloader.start(self.settings)
                     current_volume = self.music_player.get_volume()
                     game_over_screen = GameOverScreen(self.screen, self.game_state, self.player.score,self.player.level,self)
                     self.music_player.set_volume(0.7)
@@ -259,6 +351,7 @@ class Game:
             # Update camera only if not paused
             if not self.paused:
                 self.tilemap.update_camera(self.player.rect.centerx, self.player.rect.centery)
+                self.tilemap.update_stream(self.player.rect.centerx, self.player.rect.centery, self.player.velocity)
 
                 # Check game over
                 if self.player.health <= 0 and not self.debug_info["god_mode"]:
@@ -289,8 +382,7 @@ class Game:
             
             # Regenerar el mapa
             self.log("Regenerando el mapa...")
-            self.tilemap = TileMap(self.settings)
-            self.tilemap.generate()
+            self.tilemap = self.create_tilemap()
             self.log("Mapa regenerado")
 
             # Reiniciar EnemyManager primero (sin el jugador por ahora)
@@ -334,6 +426,8 @@ class Game:
             f"Escala Damage enemigos: {self.enemy_manager.damage_scale:.2f}",
             f"Spatial Grid Time: {self.debug_info['spatial_grid_time']:.2f}ms",
             f"Pathfinding Time: {self.debug_info['pathfinding_time']:.2f}ms",
+            f"Images in memory: {len(AssetManager.loaded())} ({AssetManager.memory_usage() / 1024:.0f} KB)",
+            f"AI Budget: {self.debug_info['ai_budget_utilization'] * 100:.0f}% (max staleness {self.debug_info['ai_max_staleness']} frames, {self.debug_info['ai_forced_plans']} forced)",
             f"Current level {self.player.level}",
             f"Exp to next level {self.player.exp_to_next_level}",
             f"Exp increase rate {self.player.exp_increase_rate}",
@@ -360,8 +454,8 @@ class Game:
         Renderiza todos los elementos del juego en la pantalla.
         Dibuja en orden:
         - Fondo y capas medias del mapa
-        - Entidades (jugador, enemigos, items)
-        - Capa de superposición del mapa
+        - Ítems en el suelo
+        - Entidades (jugador, enemigos, proyectiles) y patrones del mapa, ordenados por profundidad
         - Interfaz de usuario
         - Información de depuración
         - Reproductor de música
@@ -383,17 +477,11 @@ class Game:
             # Renderizado de entidades
             if self.debug_mode:
                 self.profiler.start("draw_entities")
-            self.player.draw(self.render_surface, self.tilemap.camera_x, self.tilemap.camera_y)
-            self.enemy_manager.draw(self.render_surface, self.tilemap.camera_x, self.tilemap.camera_y)
-            for item in self.enemy_manager.items:
-                item.draw(self.render_surface, self.tilemap.camera_x, self.tilemap.camera_y)
-            if self.debug_mode:
-                self.profiler.stop()
-
-            # Renderizado de capa overlay
-            if self.debug_mode:
-                self.profiler.start("draw_overlay")
-            self.tilemap.draw_overlay_layer(self.render_surface)
+            view = self.tilemap.get_view_rect(self.settings.culling_margin)
+            self.player.submit(self.render_queue)
+            self.enemy_manager.submit(self.render_queue, view)
+            self.tilemap.submit_props(self.render_queue)
+            self.render_queue.flush(self.render_surface, self.tilemap.camera_x, self.tilemap.camera_y)
             if self.debug_mode:
                 self.profiler.stop()
 
@@ -410,11 +498,10 @@ class Game:
                 self.profiler.stop()
 
             self.music_player.draw(self.render_surface)
-            # Escalado final y presentación
+            # Presentación (escalado solo si la ventana no tiene el tamaño lógico)
             if self.debug_mode:
                 self.profiler.start("draw_final")
-            self.screen.blit(pygame.transform.scale(self.render_surface, self.screen.get_size()), (0, 0))
-            pygame.display.flip()
+            self.present()
             if self.debug_mode:
                 self.profiler.stop()
         except Exception as e:
@@ -6,6 +6,7 @@ class Settings:
         self.screen_width = 800
         self.screen_height = 600
         self.FPS = 60
+        self.scaled_window = True  # Ventana redimensionable escalada por SDL (pygame.SCALED); si no, la escala Game
 
         # Optimización de rendering
         self.enable_vsync = False
@@ -32,6 +33,10 @@ class Settings:
         self.enemy_size = (16, 16)
         self.enemy_scale = 1
         
+        # Ítems en el suelo (pre-renderizados por chunks)
+        self.item_chunk_size = 256  # Lado de cada chunk de ítems en píxeles del mundo
+        self.item_chunk_cache_mb = 16  # Memoria máxima de chunks de ítems en caché
+
         # Configuración de optimización
         self.max_enemies = 1000  # Límite máximo de enemigos
 
@@ -40,12 +45,38 @@ class Settings:
         self.collision_check_frequency = 15  # Reducida frecuencia de chequeo
         self.max_active_projectiles = 200
 
+        # Planificador de IA
+        self.ai_budget_ms = 2.0  # Presupuesto por frame para replanificar enemigos
+        self.ai_distance_falloff = 128  # Distancia (px) a la que la urgencia de replanificar se reduce a la mitad
+        self.ai_max_staleness = 60  # Frames sin replanificar tras los que un enemigo se replanifica aunque se pase del presupuesto
+        self.ai_cost_smoothing = 0.1  # Peso de cada medida en la media móvil del coste de replanificar un enemigo
+        self.influence_update_interval = 6  # Frames entre actualizaciones del mapa de influencia
+        self.influence_density_weight = 0.8  # Penalización por tiradores acumulados en una celda
+
         # Configuración del mapa
         self.tile_size = 16  # Asegurarse de que el tamaño de los tiles sea consistente
         self.map_width = 150
         self.map_height = 150
         self.view_width = self.screen_width // self.tile_size + 2
         self.view_height = self.screen_height // self.tile_size + 2
+        self.background_chunk_size = 16  # Lado de cada chunk de fondo pre-renderizado en tiles
+        self.background_chunk_cache_mb = 32  # Memoria máxima para chunks de fondo en caché
+
+        # Mundo infinito por chunks (el mapa pasa a ser una ventana que sigue al jugador)
+        self.world_streaming = False
+        self.stream_window_chunks = 10  # Lado de la ventana cargada en chunks
+        self.stream_recenter_chunks = 2  # Distancia en chunks al centro de la ventana que provoca recentrarla
+        self.stream_prefetch_chunks = 3  # Chunks por delante del jugador que se encargan según su velocidad
+        self.stream_cache_mb = 64  # Memoria máxima de chunks generados en caché
+        self.stream_workers = 2  # Procesos de generación (0 = generar en el hilo principal)
+        self.stream_place_ms = 1.0  # Tiempo por frame para colocar los patrones de los chunks encargados antes de que entren en la ventana
+        if self.world_streaming:
+            self.map_width = self.map_height = self.stream_window_chunks * self.background_chunk_size
+
+        # Búsqueda de caminos jerárquica (HPA*)
+        self.pathfinding_cluster_size = 16  # Lado de cada cluster en tiles
+        self.pathfinding_search_radius = 3  # Radio en clusters alrededor del jugador (cubre enemy_culling_distance)
+        self.pathfinding_prepare_ms = 1.0  # Tiempo por frame para expandir los clusters alrededor del jugador tras generar el mapa
 
          # Debug and optimization settings
         self.show_culling = False  # Add this line
@@ -53,12 +84,33 @@ class Settings:
         self.view_padding = 100  # Pixels to pad the visible area
         self.culling_enabled = True  # Enable visibility culling
 
+        # Transparencia de los tiles de patrón no colisionables (0-255)
+        self.overlay_alpha = 128
+
+        # Minimapa (terreno precalculado + densidad de enemigos)
+        self.minimap_enabled = True
+        self.minimap_size = 150  # Lado máximo del minimapa en píxeles de pantalla
+        self.minimap_collidable_color = (40, 40, 40)  # Color de los tiles colisionables
+        self.minimap_density_color = (255, 40, 40)  # Color de la capa de densidad de enemigos
+        self.minimap_density_max = 6  # Enemigos por celda con los que la densidad es opaca
+
         # Configuración de zoom
         self.zoom = 2  # Factor de zoom inicial
+        self.zoom_levels = [1, 1.5, 2, 3, 4]  # Zooms permitidos en partida (rueda del ratón o +/-)
+        self.zoom_cache_levels = 3  # Resoluciones de tiles y prefabs escaladas que se conservan en memoria
+        self.scaled_sprite_cache_mb = 16  # Memoria máxima de frames de sprites pre-escalados
 
         # Ruta base del proyecto
         self.base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..",".."))
 
+        # Semilla del mapa; None elige una aleatoria en cada partida
+        self.map_seed = None
+
+        # Caché en disco de mapas generados (clave: semilla + configuración de generación)
+        self.map_cache_enabled = True  # Solo se usa con map_seed fija: una semilla aleatoria no se repite
+        self.map_cache_dir = os.path.join(self.base_path, "cache", "maps")
+        self.map_cache_max_entries = 16  # Mapas guardados como máximo (se borran los usados hace más tiempo)
+
         # Configuración de las etapas de generación del mapa
         self.generation_stages = [
             {
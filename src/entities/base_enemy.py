@@ -1,8 +1,13 @@
 from managers.animation_manager import AnimatedSprite
 import pygame
+import numpy as np
 from abc import ABC, abstractmethod
 
 class BaseEnemy(AnimatedSprite):
+    # Direcciones de los rayos de detección de obstáculos (E, SE, S, SO, O, NO, N, NE)
+    RAY_DIRECTIONS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+    RAY_STEP = 8  # Separación en píxeles entre las comprobaciones de cada rayo
+
     def __init__(self, settings, position, animation_manager, enemy_data, game):
         """
         Constructor de la clase base para todos los enemigos.
@@ -33,6 +38,10 @@ class BaseEnemy(AnimatedSprite):
         self._collision_rect = pygame.Rect(0, 0, self.collision_radius*2, self.collision_radius*2)
         self._last_collision_check = 0
         self._collision_cache = {}
+
+        # Última decisión de movimiento (la replanifica el AIScheduler)
+        self.steering = pygame.Vector2()
+        self.last_plan_frame = None
         
     def check_collision_with_enemy(self, other_enemy):
         """
@@ -71,16 +80,69 @@ class BaseEnemy(AnimatedSprite):
                 other_enemy.rect.y - direction.y * push_strength
             )
 
+    def _detect_obstacles(self, tilemap):
+        """
+        Detecta obstáculos alrededor del enemigo usando raycast.
+        Parámetros:
+        - tilemap: Mapa de tiles para verificar colisiones
+
+        Funcionamiento:
+        - Emite rayos en 8 direcciones hasta detection_radius
+        - Comprueba un cuadrado de 8x8 píxeles cada RAY_STEP píxeles de cada rayo,
+          todos los de todos los rayos en una sola consulta por lotes al mapa
+        - Cada rayo que choca aporta una fuerza de evasión inversamente
+          proporcional a la distancia de su primer choque
+
+        Retorna:
+        - Vector2 con la fuerza de evasión (de módulo enemy_avoid_force), o
+          un vector nulo si no hay obstáculos
+        """
+        radius = self.detection_radius
+        distances = np.arange(0, radius, self.RAY_STEP)
+        directions = np.array(self.RAY_DIRECTIONS)
+        center_x, center_y = self.rect.center
+        xs = center_x + directions[:, :1] * distances - 4
+        ys = center_y + directions[:, 1:] * distances - 4
+        hits = tilemap.check_collisions(xs.ravel(), ys.ravel(), 8, 8).reshape(xs.shape)
+
+        avoid_force = pygame.Vector2()
+        first_hits = hits.argmax(axis=1).tolist()
+        for ray in np.flatnonzero(hits.any(axis=1)).tolist():
+            distance = int(distances[first_hits[ray]])
+            avoid_force -= pygame.Vector2(self.RAY_DIRECTIONS[ray]) * (radius - distance) / radius
+        return avoid_force.normalize() * self.settings.enemy_avoid_force if avoid_force.length() > 0 else avoid_force
+
     @abstractmethod
+    def plan_steering(self, tilemap, player_pos):
+        """
+        Método abstracto que calcula la dirección de movimiento del enemigo.
+        Parámetros:
+        - tilemap: Mapa de tiles para verificar colisiones
+        - player_pos: Posición actual del jugador
+        Retorna:
+        - Vector2 normalizado con la dirección deseada
+        Es la parte costosa de la IA; el AIScheduler decide cuándo se ejecuta.
+        """
+        pass
+
+    def plan(self, tilemap, player_pos):
+        """
+        Recalcula y guarda la decisión de movimiento del enemigo.
+        Parámetros:
+        - tilemap: Mapa de tiles para verificar colisiones
+        - player_pos: Posición actual del jugador
+        """
+        self.steering = self.plan_steering(tilemap, player_pos)
+
     def update_behavior(self, tilemap, player_pos):
         """
-        Método abstracto que define el comportamiento específico de cada tipo de enemigo.
+        Comportamiento específico de cada tipo de enemigo que no es movimiento
+        (ataques, temporizadores...). Se ejecuta cada frame.
         Parámetros:
         - tilemap: Mapa de tiles para verificar colisiones
         - player_pos: Posición actual del jugador
-        Debe ser implementado por las clases hijas.
-        """ 
-        """Comportamiento específico de cada tipo de enemigo"""
+        El movimiento según self.steering lo aplica EnemyManager en lote.
+        """
         pass
 
     def update(self, tilemap, player_pos):
@@ -108,18 +170,16 @@ class BaseEnemy(AnimatedSprite):
         self.health -= amount
         return self.health <= 0
         
-    def draw(self, screen, camera_x, camera_y):
+    def submit(self, render_queue):
         """
-        Dibuja el enemigo y su información de debug si está activado.
+        Envía el enemigo y su información de debug (si está activada) a la cola de renderizado.
         Parámetros:
-        - screen: Superficie donde dibujar
-        - camera_x: Posición X de la cámara
-        - camera_y: Posición Y de la cámara
+        - render_queue: RenderQueue del frame
         En modo debug muestra:
         - Vida actual (HP)
         - Daño que causa (DMG)
         """
-        super().draw(screen, camera_x, camera_y)
+        super().submit(render_queue)
         
         # Si el juego está en modo debug, mostrar vida y daño
         if self.game.debug_mode:
@@ -129,16 +189,8 @@ class BaseEnemy(AnimatedSprite):
             health_text = self.debug_font.render(f"HP:{self.health:.0f}", True, (255, 0, 0))
             damage_text = self.debug_font.render(f"DMG:{self.damage:.1f}", True, (255, 165, 0))
             
-            # Calcular posiciones ajustadas a la cámara y el zoom
-            health_pos = (
-                (self.rect.centerx - health_text.get_width()/2) * self.settings.zoom - camera_x * self.settings.zoom,
-                (self.rect.top - 20) * self.settings.zoom - camera_y * self.settings.zoom
-            )
-            damage_pos = (
-                (self.rect.centerx - damage_text.get_width()/2) * self.settings.zoom - camera_x * self.settings.zoom,
-                (self.rect.top - 5) * self.settings.zoom - camera_y * self.settings.zoom
-            )
-            
-            # Dibujar textos
-            screen.blit(health_text, health_pos)
-            screen.blit(damage_text, damage_pos)
\ No newline at end of file
+            # Enviar textos a la capa de debug (la cola aplica cámara y zoom)
+            render_queue.submit("debug", health_text,
+                                self.rect.centerx - health_text.get_width()/2, self.rect.top - 20)
+            render_queue.submit("debug", damage_text,
+                                self.rect.centerx - damage_text.get_width()/2, self.rect.top - 5)
\ No newline at end of file
@@ -33,19 +33,21 @@ class SlimeEnemy(BaseEnemy):
         super().__init__(settings, position, animation_manager, enemy_data,game)
         self.enemy_manager = enemy_manager
 
-    def update_behavior(self, tilemap, player_pos):
+    def plan_steering(self, tilemap, player_pos):
         """
-        Actualiza el comportamiento del Slime en cada frame.
+        Calcula la dirección de movimiento del Slime.
         Parámetros:
         - tilemap: Mapa de tiles para verificar colisiones
         - player_pos: Posición actual del jugador
-        Comportamiento:
-        - Persigue al jugador
-        - Evita obstáculos
-        - Actualiza posición considerando colisiones
+        Retorna:
+        - Vector2 normalizado que persigue al jugador evitando obstáculos,
+          siguiendo el camino del buscador jerárquico si existe
         """
         # Comportamiento básico del slime: perseguir al jugador y evitar obstáculos
-        to_player = pygame.Vector2(player_pos) - pygame.Vector2(self.rect.center)
+        target = player_pos
+        if tilemap.pathfinder:
+            target = tilemap.pathfinder.next_waypoint(self.rect.center, player_pos) or player_pos
+        to_player = pygame.Vector2(target) - pygame.Vector2(self.rect.center)
         if to_player.length() > 0:
             to_player = to_player.normalize()
 
@@ -56,45 +58,7 @@ class SlimeEnemy(BaseEnemy):
         steering = to_player + avoid_force
         if steering.length() > 0:
             steering = steering.normalize()
-            
-        # Guardar la posición anterior
-        old_position = self.rect.topleft
-        
-        # Intentar mover
-        new_x = self.rect.x + steering.x * self.speed * self.game.delta_time
-        new_y = self.rect.y + steering.y * self.speed * self.game.delta_time
-        self.move(new_x, new_y)
-        
-        # Verificar colisiones y límites
-        if tilemap.check_collision(self.hitbox):
-            self.move(old_position[0], old_position[1])
-
-    def _detect_obstacles(self, tilemap):
-        """
-        Detecta obstáculos alrededor del Slime usando raycast.
-        Parámetros:
-        - tilemap: Mapa de tiles para verificar colisiones
-        Retorna:
-        - Vector de fuerza normalizado para evitar obstáculos
-        """
-        directions = [
-            pygame.Vector2(1, 0), pygame.Vector2(1, 1), pygame.Vector2(0, 1), pygame.Vector2(-1, 1),
-            pygame.Vector2(-1, 0), pygame.Vector2(-1, -1), pygame.Vector2(0, -1), pygame.Vector2(1, -1)
-        ]
-        avoid_force = pygame.Vector2()
-        
-        for direction in directions:
-            ray_pos = pygame.Vector2(self.rect.center)
-            
-            for distance in range(0, self.detection_radius, 8):
-                check_pos = ray_pos + direction * distance
-                check_rect = pygame.Rect(check_pos.x - 4, check_pos.y - 4, 8, 8)
-                
-                if tilemap.check_collision(check_rect):
-                    avoid_force -= direction * (self.detection_radius - distance) / self.detection_radius
-                    break
-                    
-        return avoid_force.normalize() * self.settings.enemy_avoid_force if avoid_force.length() > 0 else avoid_force
+        return steering
 
     def _resolve_stuck(self, tilemap):
         """
@@ -115,6 +79,9 @@ class SlimeEnemy(BaseEnemy):
                 break
 
 class RangedEnemy(BaseEnemy):
+    ESCAPE_RADIUS = 80  # Radio de escape para huir
+    DETECTION_RADIUS = 300  # Radio de detección para disparar
+
     def __init__(self, settings, position, animation_manager, enemy_manager,game):
         """
         Constructor del enemigo a distancia.
@@ -143,8 +110,8 @@ class RangedEnemy(BaseEnemy):
             'damage': 10,
             'scale': 1.0,
             'projectile_speed': 150,
-            'detection_radius': 300,  # Radio de detección para disparar
-            'escape_radius': 80,     # Radio de escape para huir
+            'detection_radius': self.DETECTION_RADIUS,
+            'escape_radius': self.ESCAPE_RADIUS,
             'attack_cooldown': 2.0
         }
         super().__init__(settings, position, animation_manager, enemy_data,game)
@@ -152,29 +119,18 @@ class RangedEnemy(BaseEnemy):
         self.attack_timer = 0
         self.projectiles = []  # Inicializar el atributo projectiles
 
-    def update_behavior(self, tilemap, player_pos):
+    def plan_steering(self, tilemap, player_pos):
         """
-        Actualiza el comportamiento del enemigo a distancia.
+        Calcula la dirección de movimiento del enemigo a distancia.
         Parámetros:
         - tilemap: Mapa de tiles para verificar colisiones
         - player_pos: Posición actual del jugador
-        Comportamiento:
-        - Mantiene distancia del jugador
-        - Evita obstáculos
-        - Ataca cuando el jugador está en rango
-        - Gestiona cooldown de ataque
+        Retorna:
+        - Vector2 normalizado hacia la mejor posición de tiro del mapa de
+          influencia, evitando obstáculos
         """
-        # Comportamiento básico del enemigo a distancia: mantener distancia y atacar al jugador
-        to_player = pygame.Vector2(player_pos) - pygame.Vector2(self.rect.center)
-        distance_to_player = to_player.length()
-        if distance_to_player > 0:
-            to_player = to_player.normalize()
-
-        # Mantener distancia del jugador
-        if distance_to_player < self.enemy_data['escape_radius']:
-            avoid_force = -to_player  # Huir del jugador si está dentro del radio de escape
-        else:
-            avoid_force = pygame.Vector2()
+        # Posicionarse según el mapa de influencia compartido (amenaza, densidad y zonas de tiro)
+        avoid_force = self.enemy_manager.influence_map.preferred_direction(self.rect.center)
 
         # Detectar obstáculos
         avoid_obstacles = self._detect_obstacles(tilemap)
@@ -183,84 +139,28 @@ class RangedEnemy(BaseEnemy):
         steering = avoid_force + avoid_obstacles
         if steering.length() > 0:
             steering = steering.normalize()
-            
-        # Guardar la posición anterior
-        old_position = self.rect.topleft
-        
-        # Intentar mover
-        new_x = self.rect.x + steering.x * self.speed * self.game.delta_time
-        new_y = self.rect.y + steering.y * self.speed * self.game.delta_time
-        self.move(new_x, new_y)
-        
-        # Verificar colisiones y límites
-        if tilemap.check_collision(self.hitbox):
-            self.move(old_position[0], old_position[1])
-            # Intentar moverse en una dirección diferente si hay colisión
-            self._resolve_stuck(tilemap)
+        return steering
 
-        # Atacar al jugador si está en rango de detección
-        self.attack_timer -= self.game.delta_time
-        if self.attack_timer <= 0 and distance_to_player < self.enemy_data['detection_radius']:
-            self.attack(player_pos)
-            self.attack_timer = self.enemy_data['attack_cooldown']
-
-    def _detect_obstacles(self, tilemap):
-        """
-        Detecta obstáculos alrededor del enemigo usando técnica de raycast.
-        Parámetros:
-        - tilemap: Mapa de tiles para verificar colisiones
-
-        Funcionamiento:
-        - Emite rayos en 8 direcciones diferentes (N, NE, E, SE, S, SO, O, NO)
-        - Para cada rayo, verifica colisiones a intervalos de 8 píxeles
-        - Si detecta una colisión, genera una fuerza de evasión inversamente proporcional a la distancia
-        - La fuerza es más fuerte cuanto más cerca esté el obstáculo
-
-        Retorna:
-        - Vector2 normalizado que representa la fuerza de evasión de obstáculos
-        - Si no hay obstáculos, retorna un vector nulo
-        """
-        directions = [
-            pygame.Vector2(1, 0), pygame.Vector2(1, 1), pygame.Vector2(0, 1), pygame.Vector2(-1, 1),
-            pygame.Vector2(-1, 0), pygame.Vector2(-1, -1), pygame.Vector2(0, -1), pygame.Vector2(1, -1)
-        ]
-        avoid_force = pygame.Vector2()
-        
-        for direction in directions:
-            ray_pos = pygame.Vector2(self.rect.center)
-            
-            for distance in range(0, self.enemy_data['detection_radius'], 8):
-                check_pos = ray_pos + direction * distance
-                check_rect = pygame.Rect(check_pos.x - 4, check_pos.y - 4, 8, 8)
-                
-                if tilemap.check_collision(check_rect):
-                    avoid_force -= direction * (self.enemy_data['detection_radius'] - distance) / self.enemy_data['detection_radius']
-                    break
-                    
-        return avoid_force.normalize() * self.settings.enemy_avoid_force if avoid_force.length() > 0 else avoid_force
-
-    def _resolve_stuck(self, tilemap):
+    def update_behavior(self, tilemap, player_pos):
         """
-        Intenta desatascar al enemigo cuando queda bloqueado por colisiones.
+        Actualiza el comportamiento del enemigo a distancia.
         Parámetros:
         - tilemap: Mapa de tiles para verificar colisiones
-
-        Funcionamiento:
-        - Prueba movimientos en 4 direcciones cardinales (derecha, izquierda, arriba, abajo)
-        - Para cada dirección, intenta un pequeño movimiento (10% de la velocidad normal)
-        - Se detiene en la primera dirección que no resulte en colisión
-        - Si ninguna dirección funciona, el enemigo permanecerá en su posición actual
+        - player_pos: Posición actual del jugador
+        Comportamiento:
+        - Ataca cuando el jugador está en rango y no hay obstáculos entre ambos
+        - Gestiona cooldown de ataque
+        El movimiento lo resuelve EnemyManager en lote para toda la población.
         """
-        # Intentar moverse en una dirección diferente si hay colisión
-        directions = [
-            pygame.Vector2(1, 0), pygame.Vector2(-1, 0), pygame.Vector2(0, 1), pygame.Vector2(0, -1)
-        ]
-        for direction in directions:
-            new_x = self.rect.x + direction.x * self.speed * 0.1
-            new_y = self.rect.y + direction.y * self.speed * 0.1
-            self.move(new_x, new_y)
-            if not tilemap.check_collision(self.hitbox):
-                break
+        # Atacar al jugador si está en rango de detección y a la vista
+        dx = player_pos[0] - self.rect.centerx
+        dy = player_pos[1] - self.rect.centery
+        distance_to_player = (dx * dx + dy * dy) ** 0.5
+        self.attack_timer -= self.game.delta_time
+        if (self.attack_timer <= 0 and distance_to_player < self.enemy_data['detection_radius']
+                and tilemap.has_line_of_sight(self.rect.center, player_pos)):
+            self.attack(player_pos)
+            self.attack_timer = self.enemy_data['attack_cooldown']
 
     def attack(self, player_pos):
         """
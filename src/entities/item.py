@@ -17,9 +17,24 @@ class Item(SpriteObject):
         """
         image = animation_manager.get_animation(animation_name)[0][0]
         self.game = game
+        self.animation_manager = animation_manager
+        self.animation_name = animation_name
+        self.scale = (size[0] / image.get_width(), size[1] / image.get_height())  # Escala (x, y) respecto al frame original
         super().__init__(image, position, size, settings,game)
         self.settings = settings
 
+    def get_zoomed_image(self, zoom):
+        """
+        Obtiene la imagen del ítem escalada al zoom.
+
+        Parámetros:
+        - zoom: Zoom de la cámara
+
+        Retorna:
+        - Frame pre-escalado compartido por todos los ítems del mismo tipo
+        """
+        return self.animation_manager.get_frame(self.animation_name, 0, self.scale, zoom)
+
 class Gem(Item):
     def __init__(self, settings, animation_manager, position,game):
         """
@@ -141,10 +141,9 @@ class Player(AnimatedSprite):
             self.move(old_position[0], old_position[1])
         
         # Keep in bounds    
-        new_x = max(0, min(self.rect.x,
-            self.settings.map_width * self.settings.tile_size - self.settings.player_size[0]))
-        new_y = max(0, min(self.rect.y,
-            self.settings.map_height * self.settings.tile_size - self.settings.player_size[1]))
+        left, top, right, bottom = tilemap.pixel_bounds()
+        new_x = max(left, min(self.rect.x, right - self.settings.player_size[0]))
+        new_y = max(top, min(self.rect.y, bottom - self.settings.player_size[1]))
         self.move(new_x, new_y)
 
         # Actualizar ataques
@@ -153,21 +152,8 @@ class Player(AnimatedSprite):
             attack.attack()  # Lanzar ataque automáticamente después del cooldown
 
         # Recoger ítems
-        return self.collect_items(self.enemy_manager.items)
+        return self.collect_items(self.enemy_manager.item_layer.query(self.hitbox))
 
-    def draw(self, screen, camera_x, camera_y):
-        """
-        Dibuja al jugador y sus ataques en la pantalla.
-        
-        Parámetros:
-        - screen: Superficie donde dibujar
-        - camera_x: Posición X de la cámara
-        - camera_y: Posición Y de la cámara
-        """
-        super().draw(screen, camera_x, camera_y)
-        for attack in self.attacks:
-            attack.draw(screen, camera_x, camera_y)
-            
     def level_up(self):
         """
         Gestiona la subida de nivel del jugador.
@@ -190,7 +176,7 @@ class Player(AnimatedSprite):
         Gestiona la recolección de ítems por colisión.
         
         Parámetros:
-        - items: Lista de ítems disponibles para recoger
+        - items: Lista de ítems cercanos que se pueden recoger
         
         Efectos según el tipo de ítem:
         - Gem: Aumenta score y experiencia
@@ -211,7 +197,7 @@ class Player(AnimatedSprite):
                         level_up = self.level_up()
                 elif isinstance(item, Tuna):
                     self.health = min(self.max_health, self.health + self.max_health * 0.8)
-                items.remove(item)
+                self.enemy_manager.item_layer.remove(item)
         return level_up
     
 
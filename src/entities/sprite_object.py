@@ -1,4 +1,5 @@
 import pygame
+from managers.asset_manager import AssetManager
 
 class SpriteObject(pygame.sprite.Sprite):
     def __init__(self, image, position, size, settings,game, scale=1.0):
@@ -41,6 +42,30 @@ class SpriteObject(pygame.sprite.Sprite):
         self.rect.y = y
         self.hitbox.center = self.rect.center
 
+    def get_zoomed_image(self, zoom):
+        """
+        Obtiene la imagen del sprite escalada al zoom.
+
+        Parámetros:
+        - zoom: Zoom de la cámara
+
+        Retorna:
+        - Superficie del tamaño del rectángulo del sprite por el zoom
+
+        Las subclases con animaciones la sirven desde la caché del
+        AnimationManager; aquí se usa la caché genérica de AssetManager.
+        """
+        return AssetManager.get_scaled(self.image, (int(self.rect.width * zoom), int(self.rect.height * zoom)))
+
+    def submit(self, render_queue):
+        """
+        Envía el sprite a la cola de renderizado.
+
+        Parámetros:
+        - render_queue: RenderQueue del frame
+        """
+        render_queue.submit_sprite(self)
+
     def draw(self, screen, camera_x, camera_y):
         """
         Dibuja el sprite en la pantalla considerando la posición de la cámara y el zoom.
@@ -51,8 +76,8 @@ class SpriteObject(pygame.sprite.Sprite):
         - camera_y: Posición Y de la cámara
         
         Aplica:
-        - Escalado según el factor de zoom actual
+        - Escalado según el factor de zoom actual (imagen pre-escalada en caché)
         - Desplazamiento según la posición de la cámara
         """
-        scaled_image = pygame.transform.scale(self.image, (int(self.rect.width * self.settings.zoom), int(self.rect.height * self.settings.zoom)))
+        scaled_image = self.get_zoomed_image(self.settings.zoom)
         screen.blit(scaled_image, (self.rect.x * self.settings.zoom - camera_x * self.settings.zoom, self.rect.y * self.settings.zoom - camera_y * self.settings.zoom))
\ No newline at end of file
@@ -5,7 +5,7 @@ def install(package):
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
 # Lista de dependencias necesarias
-dependencies = ["pygame", "matplotlib", "pillow"]
+dependencies = ["pygame", "matplotlib", "pillow", "numpy"]
 
 # Verificar e instalar las dependencias
 for dependency in dependencies:
@@ -21,11 +21,17 @@ import sys
 from screens.menu import Menu
 from core.game import Game
 from managers.music_player import MusicPlayer
+from core.settings import Settings
+from world.map_preloader import MapPreloader
 
 class Main:
     def __init__(self):
         pygame.init()
-        self.screen = pygame.display.set_mode((800, 600))
+        settings = Settings()
+        # Con pygame.SCALED la superficie de la ventana mantiene el tamaño lógico y
+        # SDL la escala al redimensionar, sin coste de escalado por frame en Python
+        flags = pygame.RESIZABLE | (pygame.SCALED if settings.scaled_window else 0)
+        self.screen = pygame.display.set_mode((settings.screen_width, settings.screen_height), flags)
         pygame.display.set_caption("Eternal Strife")
         self.clock = pygame.time.Clock()
         self.running = True
@@ -33,8 +39,7 @@ class Main:
         self.music_player.set_volume(0.1)
         
         # Optimizar PyGame
-        pygame.display.set_mode((800, 600), pygame.HWSURFACE | pygame.DOUBLEBUF)
-        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP])
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.VIDEORESIZE])
         
         # Threads para rendering
         if hasattr(pygame, 'set_num_threads'):
@@ -42,6 +47,8 @@ class Main:
 
     def run(self):
         while self.running:
+            # Generar el mapa de la próxima partida mientras el jugador está en el menú
+            MapPreloader.start(Settings())
             menu = Menu(self.screen, self.music_player)
             menu.run()
             if menu.start_game:
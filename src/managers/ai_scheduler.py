@@ -0,0 +1,137 @@
+import time
+import numpy as np
+
+
+class AIScheduler:
+    def __init__(self, settings):
+        """
+        Constructor del planificador de IA con presupuesto de tiempo.
+
+        Parámetros:
+        - settings: Configuraciones generales del juego
+
+        Inicializa:
+        - Presupuesto en milisegundos por frame y antigüedad máxima garantizada
+        - Contador de frames para medir la antigüedad de cada decisión
+        - Coste estimado de una replanificación por tipo de enemigo
+        - Métricas de uso del presupuesto y antigüedad máxima
+        """
+        self.settings = settings
+        self.budget_ms = settings.ai_budget_ms
+        self.staleness_limit = settings.ai_max_staleness
+        self.distance_falloff = settings.ai_distance_falloff
+        self.cost_smoothing = settings.ai_cost_smoothing
+        self.frame = 0
+        self.plan_costs = {}  # Tipo de enemigo -> media móvil exponencial del coste de plan() en ms
+
+        # Métricas del último frame
+        self.spent_ms = 0
+        self.utilization = 0
+        self.replanned = 0
+        self.max_staleness = 0  # En frames
+        self.forced = 0  # Enemigos replanificados por encima del presupuesto por superar ai_max_staleness
+        self.forced_total = 0  # Lo mismo, acumulado desde el inicio de la partida
+
+    def _urgencies(self, enemies, player_pos):
+        """
+        Calcula la urgencia de replanificar cada enemigo.
+
+        Parámetros:
+        - enemies: Enemigos activos este frame
+        - player_pos: Posición actual del jugador
+
+        Retorna:
+        - Tupla (urgencias, antigüedades):
+        * Urgencia de cada enemigo: infinito si nunca ha planificado y si no
+          los frames desde su última decisión ponderados por la cercanía al
+          jugador, de forma que los enemigos cercanos se replanifican más a menudo
+        * Frames desde la última decisión de cada enemigo (-1 si nunca ha planificado)
+        """
+        centers = np.array([enemy.rect.center for enemy in enemies], dtype=np.float64)
+        last = np.array([-1 if enemy.last_plan_frame is None else enemy.last_plan_frame for enemy in enemies],
+                        dtype=np.float64)
+        staleness = np.where(last < 0, -1, self.frame - last)
+        distances = np.hypot(centers[:, 0] - player_pos[0], centers[:, 1] - player_pos[1])
+        urgencies = staleness / (1 + distances / self.distance_falloff)
+        urgencies[last < 0] = np.inf
+        return urgencies, staleness
+
+    def _plan_cost(self, enemy):
+        """
+        Obtiene el coste estimado en ms de replanificar un enemigo (0 si aún no se ha medido).
+        """
+        return self.plan_costs.get(type(enemy), 0.0)
+
+    def update(self, enemies, tilemap, player_pos):
+        """
+        Replanifica la dirección de un subconjunto rotatorio de enemigos.
+
+        Parámetros:
+        - enemies: Enemigos activos este frame
+        - tilemap: Mapa de tiles para verificar colisiones
+        - player_pos: Posición actual del jugador
+
+        Proceso:
+        1. Los enemigos que llegan a ai_max_staleness frames sin replanificar
+           van primero y se replanifican aunque se agote el presupuesto
+        2. Estima cuántos enemigos más caben en el presupuesto con el coste
+           medido de cada tipo y selecciona solo esos candidatos por urgencia
+           (más antiguos y cercanos primero) con argpartition, sin ordenar a todos
+        3. Replanifica en orden de urgencia mientras el coste estimado del
+           siguiente quepa antes del límite del frame
+        4. Actualiza la media móvil del coste de cada tipo con lo medido
+        5. El resto sigue su última decisión
+
+        Siempre replanifica al menos un enemigo para garantizar el avance, y
+        ningún enemigo activo pasa de ai_max_staleness frames sin replanificar.
+        """
+        self.frame += 1
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000
+        replanned = 0
+        forced = 0
+
+        if enemies:
+            urgencies, staleness = self._urgencies(enemies, player_pos)
+            overdue = np.flatnonzero(staleness >= self.staleness_limit)
+            # Los atrasados ya van primero: no compiten por los huecos del presupuesto
+            urgencies = -urgencies
+            urgencies[overdue] = np.inf
+
+            # Como mucho caben tantos como replanificaciones del tipo más barato
+            cheapest = min(self.plan_costs.values(), default=0.0)
+            count = len(enemies) - len(overdue)
+            if cheapest > 0:
+                count = min(count, int(self.budget_ms / cheapest) + 1)
+            if count <= 0:
+                candidates = np.zeros(0, dtype=np.int64)
+            elif count < len(enemies):
+                candidates = np.sort(np.argpartition(urgencies, count - 1)[:count])
+            else:
+                candidates = np.arange(count)
+            # A igual urgencia se respeta el orden de la lista de enemigos
+            candidates = candidates[np.argsort(urgencies[candidates], kind="stable")]
+
+            for position, index in enumerate(np.concatenate([overdue, candidates]).tolist()):
+                enemy = enemies[index]
+                cost = self._plan_cost(enemy)
+                now = time.perf_counter()
+                if replanned and now + cost / 1000 > deadline:
+                    if position >= len(overdue):
+                        break
+                    forced += 1
+                enemy.plan(tilemap, player_pos)
+                enemy.last_plan_frame = self.frame
+                replanned += 1
+                spent = (time.perf_counter() - now) * 1000
+                self.plan_costs[type(enemy)] = spent if cost == 0 else cost + self.cost_smoothing * (spent - cost)
+
+        self.spent_ms = (time.perf_counter() - start) * 1000
+        self.utilization = self.spent_ms / self.budget_ms if self.budget_ms > 0 else 0
+        self.replanned = replanned
+        self.forced = forced
+        self.forced_total += forced
+        self.max_staleness = max(
+            (self.frame - enemy.last_plan_frame for enemy in enemies if enemy.last_plan_frame is not None),
+            default=0
+        )
@@ -1,6 +1,8 @@
 import pygame
 import os
+from collections import OrderedDict
 from entities.sprite_object import SpriteObject
+from managers.asset_manager import AssetManager
 
 class AnimationManager:
     def __init__(self, settings, game):
@@ -14,6 +16,7 @@ class AnimationManager:
         Inicializa:
         - Diccionario de animaciones
         - Sistema de caché
+        - Caché LRU de frames pre-escalados por (animación, frame, escala, zoom)
         - Tiempo global
         - Estado de pausa
         """
@@ -21,6 +24,9 @@ class AnimationManager:
         self.game = game  # Referencia al juego
         self.animations = self.load_animations(settings.animation_configs)
         self.cache = {}  # Caché para almacenar frames de animación
+        self.scaled_frames = OrderedDict()  # (animación, frame, escala (x, y), zoom) -> superficie (LRU)
+        self.scaled_frames_bytes = 0
+        self.scaled_frames_budget = settings.scaled_sprite_cache_mb * 1024 * 1024
         self.global_time = 0  # Tiempo global para sincronizar animaciones
         self.paused = False  # Add pause state
 
@@ -38,7 +44,7 @@ class AnimationManager:
         """
         animations = {}
         for name, anim_data in config.items():
-            spritesheet = pygame.image.load(anim_data['spritesheet']).convert_alpha()
+            spritesheet = AssetManager.load_image(anim_data['spritesheet'])
             frames = []
             for frame_data in anim_data['frames']:
                 frame_index = frame_data['index']
@@ -67,6 +73,45 @@ class AnimationManager:
         self.cache[name] = animation
         return animation
 
+    def get_frame(self, name, index, scale=(1.0, 1.0), zoom=1):
+        """
+        Obtiene un frame de animación ya escalado.
+
+        Parámetros:
+        - name: Nombre de la animación
+        - index: Índice del frame dentro de la animación
+        - scale: Tupla (x, y) con la escala del sprite en el mundo respecto al frame original
+        - zoom: Zoom de la cámara
+
+        Retorna:
+        - Superficie compartida por todos los sprites que la usan; no se debe modificar
+
+        Cada combinación se escala una sola vez: primero a la escala del sprite
+        y después al zoom, igual que se hacía al dibujar. Se descartan los frames
+        usados hace más tiempo cuando se supera scaled_sprite_cache_mb.
+        """
+        key = (name, index, scale, zoom)
+        frame = self.scaled_frames.get(key)
+        if frame is not None:
+            self.scaled_frames.move_to_end(key)
+            return frame
+
+        if zoom != 1:
+            base = self.get_frame(name, index, scale)
+            size = (int(base.get_width() * zoom), int(base.get_height() * zoom))
+        else:
+            base = self.get_animation(name)[index][0]
+            size = (int(base.get_width() * scale[0]), int(base.get_height() * scale[1]))
+            if scale == (1, 1):
+                return base
+        frame = pygame.transform.scale(base, size)
+        self.scaled_frames[key] = frame
+        self.scaled_frames_bytes += frame.get_pitch() * frame.get_height()
+        while self.scaled_frames_bytes > self.scaled_frames_budget and len(self.scaled_frames) > 1:
+            _, evicted = self.scaled_frames.popitem(last=False)
+            self.scaled_frames_bytes -= evicted.get_pitch() * evicted.get_height()
+        return frame
+
     def update(self):
         """
         Actualiza el tiempo global de animación.
@@ -132,6 +177,9 @@ class AnimatedSprite(SpriteObject):
         self.time_accumulator = 0
         self.paused = False  # Add pause state
         self.update_frequency = update_frequency  # Frecuencia de actualización de la animación
+        # Escala (x, y) respecto al frame original con la que se piden los frames pre-escalados
+        frame = self.frames[self.current_frame][0]
+        self.scale = (size[0] / frame.get_width(), size[1] / frame.get_height())
         super().__init__(self.frames[self.current_frame][0], position, size, settings,self.game)
 
     def change_animation(self, animation_name):
@@ -148,6 +196,11 @@ class AnimatedSprite(SpriteObject):
         if self.animation_name != animation_name:
             self.animation_name = animation_name
             self.frames = self.animation_manager.get_animation(animation_name)
+            if self.scale != (1, 1):
+                self.frames = [
+                    (self.animation_manager.get_frame(animation_name, index, self.scale), duration)
+                    for index, (_, duration) in enumerate(self.frames)
+                ]
             self.current_frame = 0
             self.time_accumulator = 0
             self.image = self.frames[self.current_frame][0]
@@ -162,21 +215,33 @@ class AnimatedSprite(SpriteObject):
         Mantiene:
         - Centro del sprite
         - Centro del hitbox
+        
+        Los frames escalados salen de la caché del AnimationManager, así que
+        todos los sprites con la misma animación y escala los comparten.
         """
         if scale != 1:
+            self.scale = (scale, scale)
             self.frames = [
-                (pygame.transform.scale(
-                    frame[0], 
-                    (int(frame[0].get_width() * scale), 
-                     int(frame[0].get_height() * scale))
-                ), frame[1])
-                for frame in self.frames
+                (self.animation_manager.get_frame(self.animation_name, index, self.scale), frame[1])
+                for index, frame in enumerate(self.frames)
             ]
             self.image = self.frames[self.current_frame][0]
             old_center = self.rect.center
             self.rect = self.image.get_rect(center=old_center)
             self.hitbox.center = self.rect.center
         
+    def get_zoomed_image(self, zoom):
+        """
+        Obtiene el frame actual escalado al zoom desde la caché del AnimationManager.
+
+        Parámetros:
+        - zoom: Zoom de la cámara
+
+        Retorna:
+        - Superficie pre-escalada del frame actual
+        """
+        return self.animation_manager.get_frame(self.animation_name, self.current_frame, self.scale, zoom)
+
     def update(self):
         """
         Actualiza el frame actual de la animación según el tiempo transcurrido.
@@ -0,0 +1,98 @@
+import pygame
+from collections import OrderedDict
+
+
+class AssetManager:
+    # Imágenes decodificadas compartidas por todo el proceso: (ruta, alfa) -> superficie
+    _images = {}
+    # Copias escaladas de superficies (LRU): (superficie, tamaño) -> superficie escalada
+    _scaled = OrderedDict()
+    _scaled_bytes = 0
+    scaled_budget = 16 * 1024 * 1024  # Memoria máxima de las copias escaladas
+
+    @classmethod
+    def load_image(cls, path, alpha=True):
+        """
+        Obtiene una imagen decodificada y convertida al formato de pantalla.
+
+        Parámetros:
+        - path: Ruta del archivo de imagen
+        - alpha: Si se convierte conservando el canal alfa (convert_alpha) o no (convert)
+
+        Retorna:
+        - Superficie compartida; quien la use no debe modificarla
+
+        El archivo solo se decodifica la primera vez. Las reglas que comparten
+        tileset y los mapas regenerados al reiniciar reciben la misma superficie.
+        """
+        key = (path, alpha)
+        image = cls._images.get(key)
+        if image is None:
+            try:
+                image = pygame.image.load(path)
+                image = image.convert_alpha() if alpha else image.convert()
+            except Exception as e:
+                print(f"Error cargando imagen {path}: {e}")
+                raise
+            cls._images[key] = image
+        return image
+
+    @classmethod
+    def get_scaled(cls, surface, size):
+        """
+        Obtiene una copia escalada de una superficie.
+
+        Parámetros:
+        - surface: Superficie original (por ejemplo, un frame de animación)
+        - size: Tupla (ancho, alto) en píxeles
+
+        Retorna:
+        - Superficie escalada compartida; quien la use no debe modificarla
+
+        Cada frame se escala una sola vez por tamaño (es decir, por zoom) y se
+        reutiliza en los frames siguientes. Se descartan las copias usadas hace
+        más tiempo cuando se supera scaled_budget.
+        """
+        key = (surface, size)
+        scaled = cls._scaled.get(key)
+        if scaled is not None:
+            cls._scaled.move_to_end(key)
+            return scaled
+
+        scaled = pygame.transform.scale(surface, size)
+        cls._scaled[key] = scaled
+        cls._scaled_bytes += scaled.get_pitch() * scaled.get_height()
+        while cls._scaled_bytes > cls.scaled_budget and len(cls._scaled) > 1:
+            _, evicted = cls._scaled.popitem(last=False)
+            cls._scaled_bytes -= evicted.get_pitch() * evicted.get_height()
+        return scaled
+
+    @classmethod
+    def loaded(cls):
+        """
+        Obtiene las imágenes cargadas y la memoria que ocupa cada una.
+
+        Retorna:
+        - Diccionario (ruta, alfa) -> bytes de píxeles de la superficie
+        """
+        return {key: image.get_pitch() * image.get_height() for key, image in cls._images.items()}
+
+    @classmethod
+    def memory_usage(cls):
+        """
+        Calcula la memoria total de las imágenes cargadas.
+
+        Retorna:
+        - Número total de bytes de píxeles
+        """
+        return sum(cls.loaded().values())
+
+    @classmethod
+    def clear(cls):
+        """
+        Libera todas las imágenes del registro y las copias escaladas.
+        Las superficies siguen vivas mientras alguien conserve una referencia.
+        """
+        cls._images.clear()
+        cls._scaled.clear()
+        cls._scaled_bytes = 0
@@ -1,9 +1,13 @@
 import pygame
 import random
 import math
+import numpy as np
 from entities.enemy_types import SlimeEnemy, RangedEnemy
 from entities.item import Item, Gem, Tuna
 from attacks.projectile import Projectile
+from managers.ai_scheduler import AIScheduler
+from managers.influence_map import InfluenceMap
+from managers.item_layer import ItemLayer
 
 class EnemyManager:
     def __init__(self, settings, player, animation_manager, tilemap, game):
@@ -29,7 +33,8 @@ class EnemyManager:
         self.animation_manager = animation_manager
         self.tilemap = tilemap
         self.enemies = []
-        self.items = []
+        self.item_layer = ItemLayer(settings)  # Ítems en el suelo, dibujados por chunks
+        self.items = self.item_layer.items
         self.projectiles = []
         self.spawn_timer = 0
         self.time_elapsed = 0
@@ -54,6 +59,13 @@ class EnemyManager:
         self.grid_width = self.settings.map_width * self.settings.tile_size // self.cell_size + 1
         self.grid_height = self.settings.map_height * self.settings.tile_size // self.cell_size + 1
         self.spatial_grid = {}
+        self.projectile_grid = {}  # Proyectiles enemigos y del jugador por celda, se rehace al dibujar
+
+        # Mapa de influencia para el posicionamiento de enemigos a distancia
+        self.influence_map = InfluenceMap(self.settings, tilemap, self.cell_size, self.grid_width, self.grid_height)
+
+        # Planificador de IA con presupuesto de tiempo por frame
+        self.ai_scheduler = AIScheduler(self.settings)
         
         # Tipos de enemigos con sus pesos
         self.enemy_types = {
@@ -126,6 +138,80 @@ class EnemyManager:
         dy = pos[1] - camera_pos[1]
         return (dx * dx + dy * dy) <= (self.settings.enemy_culling_distance * self.settings.enemy_culling_distance)
 
+    def _update_projectile_grid(self):
+        """
+        Reparte en la rejilla espacial los proyectiles enemigos y los de los ataques del jugador.
+        
+        Se rehace justo antes de dibujar, de forma que también incluye los
+        proyectiles lanzados durante el frame.
+        """
+        self.projectile_grid.clear()
+        for attack in self.player.attacks:
+            for projectile in attack.projectiles:
+                self.projectile_grid.setdefault(self._get_grid_cell(projectile.rect.center), []).append(projectile)
+        for projectile in self.projectiles:
+            self.projectile_grid.setdefault(self._get_grid_cell(projectile.rect.center), []).append(projectile)
+
+    def _query_grid(self, grid, view):
+        """
+        Obtiene las entidades de una rejilla espacial que tocan un rectángulo.
+        
+        Parámetros:
+        - grid: Diccionario celda -> entidades
+        - view: pygame.Rect en píxeles del mundo
+        
+        Retorna:
+        - Lista de entidades cuyo rect toca el rectángulo
+        
+        Recorre las celdas que cubren el rectángulo, ampliado una celda porque
+        la rejilla de enemigos se construye antes de moverlos.
+        """
+        size = self.cell_size
+        found = []
+        for cell_y in range(view.top // size - 1, (view.bottom - 1) // size + 2):
+            for cell_x in range(view.left // size - 1, (view.right - 1) // size + 2):
+                for entity in grid.get((cell_x, cell_y), ()):
+                    if view.colliderect(entity.rect):
+                        found.append(entity)
+        return found
+
+    def get_visible_entities(self, view):
+        """
+        Consulta de visibilidad con el rectángulo de la cámara.
+        
+        Parámetros:
+        - view: pygame.Rect visible en píxeles del mundo (ampliado con culling_margin)
+        
+        Retorna:
+        - Tupla (sprites, chunks de ítems) que tocan el rectángulo: los sprites
+          son enemigos, proyectiles enemigos y proyectiles del jugador
+        
+        Enemigos y proyectiles salen de las celdas de la rejilla espacial que
+        cubren el rectángulo, y los ítems de los chunks de ItemLayer. Todos
+        cuentan para settings.max_visible_entities (cada chunk de ítems es una
+        sola superficie): si se supera se conservan los más cercanos al centro,
+        y con un límite de 0 o menos no se dibuja nada.
+        """
+        limit = self.settings.max_visible_entities
+        if limit <= 0:
+            return [], []
+
+        self._update_projectile_grid()
+        # Los eliminados durante el frame siguen en la rejilla hasta la próxima actualización
+        sprites = [enemy for enemy in self._query_grid(self.spatial_grid, view) if enemy.health > 0]
+        sprites.extend(self._query_grid(self.projectile_grid, view))
+        chunks = self.item_layer.visible_chunks(view)
+
+        if len(sprites) + len(chunks) > limit:
+            sprite_count = len(sprites)
+            centers = np.array([sprite.rect.center for sprite in sprites] +
+                               [self.item_layer.chunk_center(key) for key in chunks], dtype=np.float64)
+            distances = ((centers - view.center) ** 2).sum(axis=1)
+            keep = np.sort(np.argpartition(distances, limit - 1)[:limit]).tolist()
+            chunks = [chunks[i - sprite_count] for i in keep if i >= sprite_count]
+            sprites = [sprites[i] for i in keep if i < sprite_count]
+        return sprites, chunks
+
     def _get_random_enemy_type(self):
         """
         Selecciona un tipo de enemigo aleatorio basado en los pesos.
@@ -152,11 +238,10 @@ class EnemyManager:
         spawn_x = self.player.rect.x + math.cos(angle) * distance
         spawn_y = self.player.rect.y + math.sin(angle) * distance
 
-        # Mantener dentro de los límites del mapa
-        spawn_x = max(0, min(spawn_x, 
-            self.settings.map_width * self.settings.tile_size - self.settings.enemy_size[0]))
-        spawn_y = max(0, min(spawn_y, 
-            self.settings.map_height * self.settings.tile_size - self.settings.enemy_size[1]))
+        # Mantener dentro de los límites del mapa (o de la ventana cargada del mundo infinito)
+        left, top, right, bottom = self.tilemap.pixel_bounds()
+        spawn_x = max(left, min(spawn_x, right - self.settings.enemy_size[0]))
+        spawn_y = max(top, min(spawn_y, bottom - self.settings.enemy_size[1]))
 
         enemy_class = self._get_random_enemy_type()
         enemy = enemy_class(self.settings, (spawn_x, spawn_y), self.animation_manager, self, self.game)
@@ -178,6 +263,7 @@ class EnemyManager:
         - Temporizadores y factores de dificultad
         - Spawn de enemigos
         - Rejilla espacial
+        - Mapa de influencia y planificación de IA
         - Estado de enemigos y colisiones
         - Proyectiles
         """
@@ -210,9 +296,35 @@ class EnemyManager:
         # Actualizar rejilla espacial
         self._update_spatial_grid()
 
+        # La visibilidad solo es válida durante el frame actual
+        tilemap.clear_line_of_sight_cache()
+
+        # Terminar de preparar el buscador de caminos sin bloquear el frame
+        if tilemap.pathfinder:
+            tilemap.pathfinder.prepare_step(self.settings.pathfinding_prepare_ms)
+
+        # Replanificar la IA de los enemigos activos dentro del presupuesto
+        player_center = (self.player.rect.centerx, self.player.rect.centery)
+        active_enemies = [enemy for enemy in self.enemies if self._is_in_view(enemy.rect.center, player_center)]
+        self.influence_map.update(
+            player_center,
+            [enemy for enemy in active_enemies if isinstance(enemy, RangedEnemy)],
+            RangedEnemy.ESCAPE_RADIUS,
+            RangedEnemy.DETECTION_RADIUS
+        )
+        self.ai_scheduler.update(active_enemies, tilemap, player_center)
+        self.game.debug_info["pathfinding_time"] = self.ai_scheduler.spent_ms
+        self.game.debug_info["ai_budget_utilization"] = self.ai_scheduler.utilization
+        self.game.debug_info["ai_max_staleness"] = self.ai_scheduler.max_staleness
+        self.game.debug_info["ai_forced_plans"] = self.ai_scheduler.forced_total
+
+        # Mover a todos los enemigos activos en lote
+        self._move_enemies(active_enemies, tilemap)
+
         # Actualizar enemigos
+        active_set = set(active_enemies)
         for enemy in self.enemies[:]:
-            if self._is_in_view(enemy.rect.center, (self.player.rect.centerx, self.player.rect.centery)):
+            if enemy in active_set:
                 enemy.update(tilemap, self.player.rect.center)
                 
                 # Comprobar colisiones con otros enemigos
@@ -238,6 +350,41 @@ class EnemyManager:
             if projectile.update(self.player, self):
                 self.projectiles.remove(projectile)
 
+    def _move_enemies(self, enemies, tilemap):
+        """
+        Mueve todos los enemigos activos según su última decisión en un solo paso.
+
+        Parámetros:
+        - enemies: Enemigos activos este frame
+        - tilemap: Mapa de tiles para colisiones
+
+        Calcula las posiciones propuestas de forma vectorizada y las valida
+        contra el mapa con una única consulta en lote, deslizando por ejes
+        a los enemigos que chocan.
+        """
+        if not enemies:
+            return
+        delta_time = self.game.delta_time
+        data = np.array([
+            (enemy.rect.x, enemy.rect.y,
+             enemy.hitbox.x - enemy.rect.x, enemy.hitbox.y - enemy.rect.y,
+             enemy.hitbox.width, enemy.hitbox.height,
+             enemy.steering.x * enemy.speed, enemy.steering.y * enemy.speed)
+            for enemy in enemies
+        ], dtype=np.float64)
+        old_x, old_y = data[:, 0], data[:, 1]
+        offset_x, offset_y = data[:, 2], data[:, 3]
+        new_x = np.round(old_x + data[:, 6] * delta_time)
+        new_y = np.round(old_y + data[:, 7] * delta_time)
+
+        xs, ys, _ = tilemap.resolve_moves(
+            old_x + offset_x, old_y + offset_y,
+            new_x + offset_x, new_y + offset_y,
+            data[:, 4], data[:, 5]
+        )
+        for enemy, x, y in zip(enemies, (xs - offset_x).tolist(), (ys - offset_y).tolist()):
+            enemy.move(int(x), int(y))
+
     def remove_enemy(self, enemy):
         """
         Elimina un enemigo y genera un ítem en su posición.
@@ -264,7 +411,7 @@ class EnemyManager:
             item = Gem(self.settings, self.animation_manager, position,self.game)
         else:
             item = Tuna(self.settings, self.animation_manager, position,self.game)
-        self.items.append(item)
+        self.item_layer.add(item)
 
     def add_projectile(self, projectile):
         """
@@ -275,21 +422,17 @@ class EnemyManager:
         """
         self.projectiles.append(projectile)
 
-    def draw(self, screen, camera_x, camera_y):
+    def submit(self, render_queue, view):
         """
-        Dibuja todos los enemigos y proyectiles visibles.
+        Envía los enemigos, proyectiles e ítems visibles a la cola de renderizado.
         
         Parámetros:
-        - screen: Superficie donde dibujar
-        - camera_x: Posición X de la cámara
-        - camera_y: Posición Y de la cámara
-        """
-        # Dibujar enemigos
-        for enemy in self.enemies:
-            if self._is_in_view(enemy.rect.center, (camera_x, camera_y)):
-                enemy.draw(screen, camera_x, camera_y)
+        - render_queue: RenderQueue del frame
+        - view: pygame.Rect visible en píxeles del mundo
         
-        # Dibujar proyectiles
-        for projectile in self.projectiles:
-            if self._is_in_view(projectile.rect.center, (camera_x, camera_y)):
-                projectile.draw(screen, camera_x, camera_y)
\ No newline at end of file
+        Incluye los proyectiles de los ataques del jugador.
+        """
+        sprites, chunks = self.get_visible_entities(view)
+        self.item_layer.submit(render_queue, chunks)
+        for sprite in sprites:
+            sprite.submit(render_queue)
\ No newline at end of file
@@ -0,0 +1,164 @@
+import numpy as np
+import pygame
+
+# Núcleo gaussiano 1D separable usado para difuminar los mapas
+BLUR_KERNEL = np.array([1, 4, 6, 4, 1], dtype=np.float32) / 16
+
+
+def blur(grid):
+    """
+    Difumina una rejilla con una convolución gaussiana separable.
+
+    Parámetros:
+    - grid: Array 2D de NumPy
+
+    Retorna:
+    - Nuevo array 2D del mismo tamaño
+    """
+    radius = len(BLUR_KERNEL) // 2
+    height, width = grid.shape
+    padded = np.pad(grid, radius)
+    horizontal = sum(weight * padded[:, i:i + width] for i, weight in enumerate(BLUR_KERNEL))
+    return sum(weight * horizontal[i:i + height, :] for i, weight in enumerate(BLUR_KERNEL))
+
+
+class InfluenceMap:
+    def __init__(self, settings, tilemap, cell_size, grid_width, grid_height):
+        """
+        Constructor del mapa de influencia para posicionar enemigos a distancia.
+
+        Parámetros:
+        - settings: Configuraciones generales del juego
+        - tilemap: Mapa de tiles para calcular las celdas bloqueadas
+        - cell_size: Tamaño en píxeles de cada celda (el de la rejilla espacial)
+        - grid_width, grid_height: Dimensiones de la rejilla en celdas
+
+        Inicializa:
+        - Centros de celda en píxeles para cálculos vectorizados
+        - Fracción de tiles colisionables por celda
+        - Mapa de puntuación combinado
+        """
+        self.settings = settings
+        self.tilemap = tilemap
+        self.cell_size = cell_size
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.update_interval = settings.influence_update_interval
+        self.density_weight = settings.influence_density_weight
+        self.frames_since_update = self.update_interval
+
+        ys, xs = np.mgrid[0:grid_height, 0:grid_width]
+        self.cell_centers_x = (xs + 0.5) * cell_size
+        self.cell_centers_y = (ys + 0.5) * cell_size
+
+        # Fracción de cada celda ocupada por tiles colisionables (estática mientras no cambie la ventana)
+        self.blocked = None
+        self.origin = None  # Origen en píxeles del mundo con el que se calculó blocked
+        self._build_blocked()
+
+        # Contribución de un único enemigo a la densidad difuminada de su vecindario
+        impulse = np.zeros((5, 5), dtype=np.float32)
+        impulse[2, 2] = 1
+        self.self_density = blur(impulse)[1:4, 1:4]
+
+        self.threat = np.zeros((grid_height, grid_width), dtype=np.float32)
+        self.density = np.zeros((grid_height, grid_width), dtype=np.float32)
+        self.score = np.zeros((grid_height, grid_width), dtype=np.float32)
+
+    def _build_blocked(self):
+        """
+        Calcula la fracción de tiles colisionables de cada celda.
+        
+        Se repite cuando la ventana del mundo infinito se recentra, ya que
+        las celdas pasan a cubrir otra zona del mundo.
+        """
+        tile_size = self.settings.tile_size
+        self.origin = (self.tilemap.origin_x * tile_size, self.tilemap.origin_y * tile_size)
+        self.blocked = np.zeros((self.grid_height, self.grid_width), dtype=np.float32)
+        if self.tilemap.collidables:
+            tiles = np.array(list(self.tilemap.collidables)) - (self.tilemap.origin_x, self.tilemap.origin_y)
+            inside = ((tiles[:, 0] >= 0) & (tiles[:, 0] < self.settings.map_width) &
+                      (tiles[:, 1] >= 0) & (tiles[:, 1] < self.settings.map_height))
+            cells = tiles[inside] * tile_size // self.cell_size
+            np.add.at(self.blocked, (cells[:, 1], cells[:, 0]), 1)
+            self.blocked /= (self.cell_size // tile_size) ** 2
+
+    def update(self, player_pos, shooters, escape_radius, detection_radius):
+        """
+        Recalcula el mapa de influencia cada update_interval frames.
+
+        Parámetros:
+        - player_pos: Posición actual del jugador
+        - shooters: Enemigos a distancia que usan el mapa
+        - escape_radius: Distancia por debajo de la cual el jugador es una amenaza
+        - detection_radius: Alcance de disparo de los enemigos
+
+        Combina:
+        - Amenaza del jugador (alta dentro del radio de escape)
+        - Densidad de tiradores (para repartirlos)
+        - Celdas buenas para disparar (anillo entre escape y detección, sin obstáculos)
+        """
+        tile_size = self.settings.tile_size
+        window_moved = self.origin != (self.tilemap.origin_x * tile_size, self.tilemap.origin_y * tile_size)
+        self.frames_since_update += 1
+        if self.frames_since_update < self.update_interval and not window_moved:
+            return
+        self.frames_since_update = 0
+        if window_moved:
+            self._build_blocked()
+
+        # Trabajar en coordenadas locales de la ventana
+        origin_x, origin_y = self.origin
+        distance = np.hypot(self.cell_centers_x - (player_pos[0] - origin_x),
+                            self.cell_centers_y - (player_pos[1] - origin_y))
+        self.threat = np.exp(-(distance / escape_radius) ** 2)
+
+        preferred = (escape_radius + detection_radius) / 2
+        band = (detection_radius - escape_radius) / 2
+        # Más allá de la distancia preferida la puntuación decae lentamente para atraer a los lejanos
+        ring = np.where(distance > preferred, preferred / np.maximum(distance, 1),
+                        np.exp(-((distance - preferred) / band) ** 2))
+        shooting = ring * (1 - self.blocked)
+
+        counts = np.zeros((self.grid_height, self.grid_width), dtype=np.float32)
+        if shooters:
+            positions = (np.array([shooter.rect.center for shooter in shooters]) - self.origin) // self.cell_size
+            cells_x = np.clip(positions[:, 0], 0, self.grid_width - 1)
+            cells_y = np.clip(positions[:, 1], 0, self.grid_height - 1)
+            np.add.at(counts, (cells_y, cells_x), 1)
+        self.density = blur(counts)
+
+        self.score = shooting - 2 * self.threat - self.density_weight * self.density
+
+    def preferred_direction(self, position):
+        """
+        Obtiene la dirección hacia la mejor celda vecina según el mapa.
+
+        Parámetros:
+        - position: Posición actual del enemigo en píxeles
+
+        Retorna:
+        - Vector2 normalizado hacia la celda vecina con mejor puntuación
+        - Vector nulo si la celda actual ya es la mejor
+
+        Descuenta la densidad que aporta el propio enemigo para que no huya de sí mismo.
+        """
+        position = (position[0] - self.origin[0], position[1] - self.origin[1])
+        cell_x = min(max(int(position[0] // self.cell_size), 0), self.grid_width - 1)
+        cell_y = min(max(int(position[1] // self.cell_size), 0), self.grid_height - 1)
+        x0, y0 = max(cell_x - 1, 0), max(cell_y - 1, 0)
+        x1, y1 = min(cell_x + 2, self.grid_width), min(cell_y + 2, self.grid_height)
+
+        local = self.score[y0:y1, x0:x1] + self.density_weight * self.self_density[
+            y0 - cell_y + 1:y1 - cell_y + 1, x0 - cell_x + 1:x1 - cell_x + 1]
+        best_y, best_x = np.unravel_index(np.argmax(local), local.shape)
+        best_x += x0
+        best_y += y0
+        if (best_x, best_y) == (cell_x, cell_y):
+            return pygame.Vector2()
+
+        direction = pygame.Vector2(
+            self.cell_centers_x[best_y, best_x] - position[0],
+            self.cell_centers_y[best_y, best_x] - position[1]
+        )
+        return direction.normalize() if direction.length() > 0 else direction
@@ -0,0 +1,178 @@
+import pygame
+from collections import OrderedDict
+
+
+class ItemLayer:
+    def __init__(self, settings):
+        """
+        Constructor de la capa de ítems estáticos.
+
+        Parámetros:
+        - settings: Configuraciones generales del juego
+
+        Inicializa:
+        - Lista de ítems en el suelo
+        - Cubos de ítems por chunk del mundo
+        - Caché LRU de superficies pre-renderizadas por chunk
+
+        Los ítems no se mueven, así que cada chunk se dibuja en una superficie
+        que solo se rehace al recoger un ítem del chunk. Los ítems nuevos se
+        añaden encima de la superficie ya dibujada.
+        """
+        self.settings = settings
+        self.chunk_size = settings.item_chunk_size  # Lado de cada chunk en píxeles del mundo
+        self.items = []
+        self.chunks = {}  # (chunk_x, chunk_y) -> ítems que tocan el chunk, en orden de aparición
+        self.surfaces = OrderedDict()  # (chunk_x, chunk_y) -> (zoom, superficie) (LRU)
+        self.surfaces_bytes = 0
+        self.cache_budget = settings.item_chunk_cache_mb * 1024 * 1024
+
+    def _chunk_keys(self, rect):
+        """
+        Obtiene los chunks que toca un rectángulo.
+
+        Parámetros:
+        - rect: pygame.Rect en píxeles del mundo
+
+        Retorna:
+        - Lista de coordenadas (chunk_x, chunk_y)
+        """
+        size = self.chunk_size
+        return [(chunk_x, chunk_y)
+                for chunk_y in range(rect.top // size, (rect.bottom - 1) // size + 1)
+                for chunk_x in range(rect.left // size, (rect.right - 1) // size + 1)]
+
+    def add(self, item):
+        """
+        Añade un ítem al suelo.
+
+        Parámetros:
+        - item: Ítem a añadir
+
+        Si el chunk ya está pre-renderizado, el ítem se dibuja encima sin rehacerlo.
+        """
+        self.items.append(item)
+        for key in self._chunk_keys(item.rect):
+            self.chunks.setdefault(key, []).append(item)
+            cached = self.surfaces.get(key)
+            if cached is not None:
+                zoom, surface = cached
+                surface.blit(*self._blit_args(item, key, zoom))
+
+    def remove(self, item):
+        """
+        Quita un ítem del suelo (por ejemplo, al recogerlo).
+
+        Parámetros:
+        - item: Ítem a quitar
+
+        Descarta la superficie de los chunks que tocaba el ítem.
+        """
+        self.items.remove(item)
+        for key in self._chunk_keys(item.rect):
+            bucket = self.chunks.get(key)
+            if bucket is None:
+                continue
+            bucket.remove(item)
+            if not bucket:
+                del self.chunks[key]
+            self._discard(key)
+
+    def query(self, rect):
+        """
+        Obtiene los ítems cercanos a un rectángulo.
+
+        Parámetros:
+        - rect: pygame.Rect en píxeles del mundo
+
+        Retorna:
+        - Lista sin repetidos de los ítems de los chunks que toca el rectángulo
+        """
+        nearby = {}
+        for key in self._chunk_keys(rect):
+            for item in self.chunks.get(key, ()):
+                nearby[item] = None
+        return list(nearby)
+
+    def _blit_args(self, item, key, zoom):
+        """
+        Calcula la imagen y la posición de un ítem dentro de la superficie de un chunk.
+
+        Retorna:
+        - Tupla (superficie escalada, posición)
+        """
+        return item.get_zoomed_image(zoom), ((item.rect.x - key[0] * self.chunk_size) * zoom,
+                                             (item.rect.y - key[1] * self.chunk_size) * zoom)
+
+    def _discard(self, key):
+        """
+        Elimina de la caché la superficie de un chunk.
+        """
+        cached = self.surfaces.pop(key, None)
+        if cached is not None:
+            surface = cached[1]
+            self.surfaces_bytes -= surface.get_pitch() * surface.get_height()
+
+    def _get_surface(self, key, zoom):
+        """
+        Obtiene la superficie pre-renderizada de un chunk o la dibuja.
+
+        Parámetros:
+        - key: Coordenadas (chunk_x, chunk_y)
+        - zoom: Zoom actual
+
+        Retorna:
+        - Superficie con los ítems del chunk
+
+        Descarta las superficies usadas hace más tiempo cuando se supera el
+        presupuesto de memoria (settings.item_chunk_cache_mb).
+        """
+        cached = self.surfaces.get(key)
+        if cached is not None and cached[0] == zoom:
+            self.surfaces.move_to_end(key)
+            return cached[1]
+        self._discard(key)
+
+        scaled = int(self.chunk_size * zoom)
+        surface = pygame.Surface((scaled, scaled), pygame.SRCALPHA)
+        surface.blits([self._blit_args(item, key, zoom) for item in self.chunks[key]], False)
+        self.surfaces[key] = (zoom, surface)
+        self.surfaces_bytes += surface.get_pitch() * surface.get_height()
+        while self.surfaces_bytes > self.cache_budget and len(self.surfaces) > 1:
+            _, (_, evicted) = self.surfaces.popitem(last=False)
+            self.surfaces_bytes -= evicted.get_pitch() * evicted.get_height()
+        return surface
+
+    def visible_chunks(self, view):
+        """
+        Obtiene los chunks con ítems que toca un rectángulo.
+
+        Parámetros:
+        - view: pygame.Rect visible en píxeles del mundo
+
+        Retorna:
+        - Lista de coordenadas (chunk_x, chunk_y)
+        """
+        return [key for key in self._chunk_keys(view) if key in self.chunks]
+
+    def chunk_center(self, key):
+        """
+        Obtiene el centro de un chunk en píxeles del mundo.
+        """
+        return ((key[0] + 0.5) * self.chunk_size, (key[1] + 0.5) * self.chunk_size)
+
+    def submit(self, render_queue, keys):
+        """
+        Envía chunks de ítems a la capa de suelo de la cola de renderizado.
+
+        Parámetros:
+        - render_queue: RenderQueue del frame
+        - keys: Chunks visibles a dibujar (ver visible_chunks)
+
+        Envía cada chunk como una sola superficie, sea cual sea el número de
+        ítems que contenga.
+        """
+        zoom = self.settings.zoom
+        size = self.chunk_size
+        for key in keys:
+            render_queue.submit("ground", self._get_surface(key, zoom), key[0] * size, key[1] * size)
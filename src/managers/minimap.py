@@ -0,0 +1,131 @@
+import numpy as np
+import pygame
+
+
+class Minimap:
+    def __init__(self, settings):
+        """
+        Constructor del minimapa.
+
+        Parámetros:
+        - settings: Configuraciones generales del juego
+
+        Inicializa:
+        - Terreno escalado al tamaño del minimapa (se rehace solo al cambiar de mapa)
+        - Rampa de color de la capa de densidad de enemigos
+
+        Por frame solo calcula un histograma de la rejilla espacial de enemigos
+        y lo vuelca con surfarray a superficies reservadas de antemano, que solo
+        se rehacen al cambiar el número de celdas o el tamaño en el minimapa.
+        """
+        self.settings = settings
+        self.margin = 10
+        self.terrain = None  # Terreno escalado al minimapa
+        self.terrain_source = None  # Superficie de TileMap con la que se escaló el terreno
+        self.scale = 1.0  # Píxeles del minimapa por píxel del mundo
+        self.density_color = np.array(settings.minimap_density_color, dtype=np.uint8)
+        self.density = None  # Capa de densidad con una celda por píxel
+        self.density_scaled = None  # Capa de densidad escalada al minimapa
+
+    def _update_terrain(self, tilemap):
+        """
+        Escala el terreno precalculado del mapa si ha cambiado.
+
+        Parámetros:
+        - tilemap: Mapa de tiles con su minimap_surface
+        """
+        if self.terrain_source is tilemap.minimap_surface:
+            return
+        width, height = tilemap.minimap_surface.get_size()
+        ratio = self.settings.minimap_size / max(width, height)
+        size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+        self.terrain = pygame.transform.smoothscale(tilemap.minimap_surface, size)
+        self.terrain_source = tilemap.minimap_surface
+        self.scale = ratio / self.settings.tile_size
+
+    def _density_surface(self, tilemap, enemy_manager):
+        """
+        Construye la capa de densidad de enemigos de la ventana visible del mapa.
+
+        Parámetros:
+        - tilemap: Mapa de tiles (para el origen de la ventana)
+        - enemy_manager: Gestor de enemigos con la rejilla espacial del frame
+
+        Retorna:
+        - Tupla (superficie con una celda por píxel, celda de la esquina superior izquierda),
+          o (None, None) si no hay enemigos. La superficie se reutiliza entre frames
+
+        Usa los recuentos por celda de la rejilla espacial: un solo histograma
+        ponderado, sin recorrer los enemigos uno a uno.
+        """
+        grid = enemy_manager.spatial_grid
+        if not grid:
+            return None, None
+        cell_size = enemy_manager.cell_size
+        cells = np.array(list(grid.keys()), dtype=np.float64)
+        counts = np.fromiter(map(len, grid.values()), dtype=np.float64, count=len(grid))
+
+        left, top, right, bottom = tilemap.pixel_bounds()
+        cell_x0 = left // cell_size
+        cell_y0 = top // cell_size
+        bins_x = -(-right // cell_size) - cell_x0
+        bins_y = -(-bottom // cell_size) - cell_y0
+        density, _, _ = np.histogram2d(
+            cells[:, 0], cells[:, 1], bins=(bins_x, bins_y),
+            range=((cell_x0, cell_x0 + bins_x), (cell_y0, cell_y0 + bins_y)),
+            weights=counts
+        )
+
+        if self.density is None or self.density.get_size() != (bins_x, bins_y):
+            self.density = pygame.Surface((bins_x, bins_y), pygame.SRCALPHA)
+            pygame.surfarray.pixels3d(self.density)[:] = self.density_color
+        pygame.surfarray.pixels_alpha(self.density)[:] = np.minimum(
+            density * (255 / self.settings.minimap_density_max), 255).astype(np.uint8)
+        return self.density, (cell_x0, cell_y0)
+
+    def draw(self, screen, tilemap, enemy_manager, player):
+        """
+        Dibuja el minimapa en la esquina superior derecha.
+
+        Parámetros:
+        - screen: Superficie donde dibujar
+        - tilemap: Mapa de tiles con el terreno precalculado
+        - enemy_manager: Gestor de enemigos con la rejilla espacial
+        - player: Jugador (se marca con un punto)
+        """
+        if tilemap.minimap_surface is None:
+            return
+        self._update_terrain(tilemap)
+        rect = self.terrain.get_rect(topright=(screen.get_width() - self.margin, self.margin))
+        left, top, _, _ = tilemap.pixel_bounds()
+        screen.blit(self.terrain, rect)
+
+        density, origin = self._density_surface(tilemap, enemy_manager)
+        if density is not None:
+            cell_x0, cell_y0 = origin
+            cell_size = enemy_manager.cell_size
+            size = (round(density.get_width() * cell_size * self.scale),
+                    round(density.get_height() * cell_size * self.scale))
+            position = (rect.left + round((cell_x0 * cell_size - left) * self.scale),
+                        rect.top + round((cell_y0 * cell_size - top) * self.scale))
+            if self.density_scaled is None or self.density_scaled.get_size() != size:
+                self.density_scaled = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.transform.scale(density, size, self.density_scaled)
+            screen.set_clip(rect)
+            screen.blit(self.density_scaled, position)
+            screen.set_clip(None)
+
+        # Zona visible y jugador
+        zoom = self.settings.zoom
+        view = pygame.Rect(
+            rect.left + round((tilemap.camera_x - left) * self.scale),
+            rect.top + round((tilemap.camera_y - top) * self.scale),
+            round(screen.get_width() / zoom * self.scale),
+            round(screen.get_height() / zoom * self.scale)
+        )
+        pygame.draw.rect(screen, (255, 255, 255), view.clip(rect), 1)
+        pygame.draw.circle(screen, (255, 255, 255), (
+            rect.left + round((player.rect.centerx - left) * self.scale),
+            rect.top + round((player.rect.centery - top) * self.scale)
+        ), 2)
+        pygame.draw.rect(screen, (200, 200, 200), rect, 1)
@@ -0,0 +1,149 @@
+from operator import itemgetter
+import numpy as np
+
+
+def _sprite_depth(sprite):
+    """
+    Clave de orden de un sprite: la Y de sus pies en píxeles del mundo.
+    """
+    return sprite.rect.bottom
+
+
+class RenderQueue:
+    # Capas en orden de dibujo; "depth" es la capa unificada ordenada por profundidad
+    LAYERS = ("ground", "depth", "debug")
+
+    def __init__(self, settings):
+        """
+        Constructor de la cola de renderizado.
+
+        Parámetros:
+        - settings: Configuraciones generales del juego
+
+        Inicializa:
+        - Por cada capa plana, listas paralelas de superficies y posiciones en
+          el mundo enviadas durante el frame
+        - Sprites enviados a la capa de profundidad y su orden del frame anterior
+        - Props estáticos (patrones del mapa) ya ordenados por profundidad
+
+        Los sistemas envían lo que quieren dibujar en lugar de dibujarlo. La capa
+        de profundidad mezcla entidades y patrones: los sprites se reordenan
+        partiendo del orden del frame anterior (casi ordenado, así que la
+        ordenación es casi lineal) y se intercalan con la lista de props, que
+        llega ordenada del índice del mapa. Al vaciar la cola se calculan todas
+        las posiciones de pantalla de una vez con NumPy y cada capa se dibuja
+        con una sola llamada a blits.
+        """
+        self.settings = settings
+        self.layers = {layer: ([], [], []) for layer in self.LAYERS if layer != "depth"}
+        self.sprites = []  # Sprites enviados este frame, en orden de envío
+        self.sprite_order = []  # Sprites del último frame, en orden de profundidad
+        self.statics = []  # (profundidad, superficie, x, y) de los props visibles, ordenados
+
+    def submit(self, layer, surface, x, y):
+        """
+        Añade una superficie a una capa plana.
+
+        Parámetros:
+        - layer: Nombre de la capa ("ground" o "debug")
+        - surface: Superficie ya escalada al zoom
+        - x, y: Esquina superior izquierda en píxeles del mundo
+        """
+        surfaces, xs, ys = self.layers[layer]
+        surfaces.append(surface)
+        xs.append(x)
+        ys.append(y)
+
+    def submit_sprite(self, sprite):
+        """
+        Añade un sprite a la capa de profundidad.
+
+        Parámetros:
+        - sprite: SpriteObject a dibujar (se ordena por rect.bottom)
+        """
+        self.sprites.append(sprite)
+
+    def submit_static(self, entries):
+        """
+        Establece los props estáticos visibles del frame.
+
+        Parámetros:
+        - entries: Lista de (profundidad, superficie, x, y) ya ordenada por
+          profundidad, con la profundidad en píxeles del mundo
+        """
+        self.statics = entries
+
+    def _sort_sprites(self):
+        """
+        Ordena los sprites enviados por profundidad reutilizando el orden anterior.
+
+        Retorna:
+        - Lista de sprites ordenada por profundidad
+
+        Parte del orden del frame anterior (sin los sprites que ya no se han
+        enviado y con los nuevos al final). Como las entidades apenas se mueven
+        entre frames la lista está casi ordenada, y la ordenación de Python
+        (estable) solo corrige los pocos sprites que han cambiado de posición.
+        """
+        submitted = set(self.sprites)
+        order = [sprite for sprite in self.sprite_order if sprite in submitted]
+        if len(order) < len(submitted):
+            known = set(order)
+            order.extend(sprite for sprite in self.sprites if sprite not in known)
+        order.sort(key=_sprite_depth)
+        self.sprite_order = order
+        return order
+
+    def _depth_layer(self):
+        """
+        Construye la capa de profundidad del frame.
+
+        Retorna:
+        - Tupla (superficies, xs, ys) en orden de dibujo
+
+        Intercala sprites y props: al concatenar dos tramos ya ordenados, la
+        ordenación de Python los detecta y solo los mezcla. Es estable, así que
+        a igual profundidad el prop se dibuja antes y la entidad queda encima.
+        """
+        zoom = self.settings.zoom
+        entries = self.statics + [(sprite.rect.bottom, sprite.get_zoomed_image(zoom), sprite.rect.x, sprite.rect.y)
+                                  for sprite in self._sort_sprites()]
+        entries.sort(key=itemgetter(0))
+        self.sprites = []
+        self.statics = []
+        if not entries:
+            return (), (), ()
+        _, surfaces, xs, ys = zip(*entries)
+        return surfaces, xs, ys
+
+    def flush(self, screen, camera_x, camera_y):
+        """
+        Dibuja todo lo enviado durante el frame y vacía la cola.
+
+        Parámetros:
+        - screen: Superficie donde dibujar
+        - camera_x, camera_y: Posición de la cámara
+
+        Usa Surface.fblits si está disponible (pygame-ce) y si no Surface.blits
+        sin pedir los rectángulos de vuelta.
+        """
+        zoom = self.settings.zoom
+        fblits = getattr(screen, "fblits", None)
+        for layer in self.LAYERS:
+            if layer == "depth":
+                surfaces, xs, ys = self._depth_layer()
+            else:
+                surfaces, xs, ys = self.layers[layer]
+            if not surfaces:
+                continue
+            # Misma operación que SpriteObject.draw, en bloque; blit trunca hacia cero
+            screen_xs = (np.array(xs, dtype=np.float64) * zoom - camera_x * zoom).astype(np.int64)
+            screen_ys = (np.array(ys, dtype=np.float64) * zoom - camera_y * zoom).astype(np.int64)
+            sequence = list(zip(surfaces, zip(screen_xs.tolist(), screen_ys.tolist())))
+            if fblits is not None:
+                fblits(sequence)
+            else:
+                screen.blits(sequence, False)
+            if layer != "depth":
+                for values in self.layers[layer]:
+                    values.clear()
@@ -1,4 +1,5 @@
 import pygame
+from managers.minimap import Minimap
 
 class UIManager:
     def __init__(self, settings):
@@ -9,6 +10,7 @@ class UIManager:
         - Configuraciones generales
         - Fuente para textos
         - Dimensiones de la barra de vida (30x3 píxeles)
+        - Minimapa (si está activado)
         
         Parámetros:
         - settings: Configuraciones generales del juego
@@ -18,6 +20,7 @@ class UIManager:
         # Reducir dimensiones de la barra de vida
         self.health_bar_width = 30  # Reducido de 50 a 30
         self.health_bar_height = 3  # Reducido de 5 a 3
+        self.minimap = Minimap(settings) if settings.minimap_enabled else None
 
     def draw(self, screen, player, game_state, enemy_manager, game):
         """
@@ -37,6 +40,7 @@ class UIManager:
             * Fondo gris
             * Progreso con efecto arcoíris
             * Nivel actual centrado
+        - Minimapa (esquina superior derecha)
         - Mensaje de GAME OVER (cuando corresponde)
         """
         # Ajustar posición vertical para que esté más cerca del jugador
@@ -89,6 +93,9 @@ class UIManager:
         )
         screen.blit(level_text, level_text_pos)
 
+        if self.minimap is not None:
+            self.minimap.draw(screen, game.tilemap, enemy_manager, player)
+
         if game_state.is_game_over:
             game_over_text = self.font.render("GAME OVER", True, (255, 0, 0))
             screen.blit(game_over_text,
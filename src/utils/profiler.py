@@ -69,7 +69,7 @@ class Profiler:
         # Graph 1: Render times (top left)
         ax1 = fig.add_subplot(gs[0, 0])
         render_sections = ['draw_clear_surface', 'draw_background', 'draw_entities', 
-                        'draw_overlay', 'draw_ui', 'draw_debug', 'draw_final']
+                        'draw_ui', 'draw_debug', 'draw_final']
         render_times = [self.get_average_time(section) for section in render_sections]
         bars1 = ax1.bar(range(len(render_sections)), render_times)
         ax1.set_title('Renderizado', pad=20)
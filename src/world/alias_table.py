@@ -0,0 +1,54 @@
+import numpy as np
+
+
+class AliasTable:
+    def __init__(self, values, weights):
+        """
+        Constructor de la tabla de alias para elecciones ponderadas (método de Vose).
+
+        Parámetros:
+        - values: Valores entre los que elegir
+        - weights: Peso de cada valor (no hace falta que sumen 1)
+
+        Inicializa:
+        - Probabilidad de quedarse con cada casilla
+        - Valor alternativo (alias) de cada casilla
+
+        Construirla cuesta O(n); después cada muestra cuesta O(1)
+        sea cual sea el número de valores.
+        """
+        self.values = np.asarray(values)
+        count = len(self.values)
+        scaled = np.asarray(weights, dtype=np.float64)
+        scaled = scaled * count / scaled.sum()
+
+        self.probability = np.ones(count, dtype=np.float64)
+        self.alias = np.arange(count)
+        small = [i for i in range(count) if scaled[i] < 1]
+        large = [i for i in range(count) if scaled[i] >= 1]
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            self.probability[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1 - scaled[low]
+            if scaled[high] < 1:
+                small.append(high)
+            else:
+                large.append(high)
+        # Lo que queda (por redondeo) tiene probabilidad 1 de quedarse en su casilla
+
+    def sample(self, rng, size):
+        """
+        Elige valores al azar según los pesos.
+
+        Parámetros:
+        - rng: Generador de NumPy (np.random.Generator)
+        - size: Número de muestras
+
+        Retorna:
+        - Array con los valores elegidos
+        """
+        slots = rng.integers(0, len(self.values), size)
+        keep = rng.random(size) < self.probability[slots]
+        return self.values[np.where(keep, slots, self.alias[slots])]
@@ -0,0 +1,117 @@
+import numpy as np
+from world.alias_table import AliasTable
+
+# Desplazamiento para que las coordenadas de chunk negativas den semillas válidas
+SEED_OFFSET = 2 ** 31
+
+
+def compile_rules(stages):
+    """
+    Convierte las etapas de generación en datos simples que se pueden enviar a otro proceso.
+
+    Parámetros:
+    - stages: Lista de GenerationStage
+
+    Retorna:
+    - Lista de diccionarios, uno por regla y en orden de aplicación, con:
+    * index: Posición de la regla entre todas las reglas
+    * type, base, chance, collidable, position
+    * tile_ids y weights para las reglas aleatorias
+    * width y height del patrón para las reglas de patrón
+    """
+    rules = []
+    index = 0
+    for stage in stages:
+        for rule in stage.rules:
+            compiled = {
+                "index": index,
+                "type": rule.type,
+                "base": stage.name == "base",
+                "chance": rule.chance or 0,
+                "collidable": bool(rule.collidable),
+                "position": tuple(rule.position) if rule.position else None,
+            }
+            if rule.type == "random":
+                if rule.tiles:
+                    compiled["tile_ids"] = [tile["tile"] for tile in rule.tiles]
+                    compiled["weights"] = [tile["weight"] for tile in rule.tiles]
+                else:
+                    compiled["tile_ids"] = list(range(rule.tileset.columns * rule.tileset.rows))
+                    compiled["weights"] = [1] * len(compiled["tile_ids"])
+            elif rule.pattern:
+                compiled["height"] = len(rule.pattern)
+                compiled["width"] = len(rule.pattern[0])
+            rules.append(compiled)
+            index += 1
+    return rules
+
+
+def chunk_seed(seed, chunk_x, chunk_y):
+    """
+    Deriva la semilla de un chunk a partir de la semilla del mundo.
+
+    Parámetros:
+    - seed: Semilla del mundo (TileMap.seed)
+    - chunk_x, chunk_y: Coordenadas del chunk (pueden ser negativas)
+
+    Retorna:
+    - np.random.SeedSequence única para ese chunk
+    """
+    return np.random.SeedSequence([seed, chunk_x + SEED_OFFSET, chunk_y + SEED_OFFSET])
+
+
+def generate_chunk(seed, rules, chunk_x, chunk_y, chunk_size, safe_center, safe_radius):
+    """
+    Genera el contenido de un chunk del mundo infinito.
+
+    Parámetros:
+    - seed: Semilla del mundo
+    - rules: Reglas compiladas con compile_rules
+    - chunk_x, chunk_y: Coordenadas del chunk
+    - chunk_size: Lado del chunk en tiles
+    - safe_center: Tile (x, y) alrededor del que no se generan colisiones
+    - safe_radius: Radio de la zona segura en tiles
+
+    Retorna:
+    - Tupla (layers, collision, patterns):
+    * layers: Lista de (índice de regla, array uint16 con tile_id + 1, 0 = vacío)
+    * collision: Array booleano con los tiles colisionables de las reglas aleatorias
+    * patterns: Lista de (índice de regla, x, y) con el origen de cada patrón en tiles del mundo
+
+    El resultado solo depende de los parámetros, así que un chunk descartado
+    se regenera idéntico. No usa pygame para poder ejecutarse en procesos de trabajo.
+    """
+    rng = np.random.default_rng(chunk_seed(seed, chunk_x, chunk_y))
+    x0 = chunk_x * chunk_size
+    y0 = chunk_y * chunk_size
+    ys, xs = np.ogrid[y0:y0 + chunk_size, x0:x0 + chunk_size]
+    safe_mask = (xs - safe_center[0]) ** 2 + (ys - safe_center[1]) ** 2 < safe_radius ** 2
+
+    layers = []
+    collision = np.zeros((chunk_size, chunk_size), dtype=bool)
+    patterns = []
+    for rule in rules:
+        if rule["type"] == "random":
+            mask = rng.random((chunk_size, chunk_size)) < rule["chance"]
+            if rule["collidable"]:
+                mask &= ~safe_mask
+                collision |= mask
+            layer = np.zeros((chunk_size, chunk_size), dtype=np.uint16)
+            table = AliasTable(np.asarray(rule["tile_ids"]) + 1, rule["weights"])
+            layer[mask] = table.sample(rng, int(mask.sum()))
+            layers.append((rule["index"], layer))
+        elif rule["type"] == "pattern" and "width" in rule:
+            if rule["position"]:
+                pos_x, pos_y = rule["position"]
+                if x0 <= pos_x < x0 + chunk_size and y0 <= pos_y < y0 + chunk_size:
+                    patterns.append((rule["index"], pos_x, pos_y))
+            elif rule["chance"]:
+                count = rng.binomial(chunk_size * chunk_size, rule["chance"])
+                pos_xs = x0 + rng.integers(0, chunk_size, count)
+                pos_ys = y0 + rng.integers(0, chunk_size, count)
+                nearest_x = np.clip(safe_center[0], pos_xs, pos_xs + rule["width"] - 1)
+                nearest_y = np.clip(safe_center[1], pos_ys, pos_ys + rule["height"] - 1)
+                safe = (nearest_x - safe_center[0]) ** 2 + (nearest_y - safe_center[1]) ** 2 >= safe_radius ** 2
+                patterns.extend((rule["index"], pos_x, pos_y)
+                                for pos_x, pos_y in zip(pos_xs[safe].tolist(), pos_ys[safe].tolist()))
+    return layers, collision, patterns
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from world.chunk_generator import generate_chunk
+
+
+class ChunkStream:
+    # Procesos de trabajo compartidos por todos los mapas (se crean una sola vez)
+    _executor = None
+
+    def __init__(self, settings, seed, rules, safe_center, safe_radius):
+        """
+        Constructor del flujo de chunks del mundo infinito.
+
+        Parámetros:
+        - settings: Configuraciones generales del juego
+        - seed: Semilla del mundo
+        - rules: Reglas compiladas con compile_rules
+        - safe_center: Tile (x, y) alrededor del que no se generan colisiones
+        - safe_radius: Radio de la zona segura en tiles
+
+        Inicializa:
+        - Caché LRU de chunks generados con presupuesto de memoria
+        - Trabajos pendientes en los procesos de trabajo
+        """
+        self.settings = settings
+        self.seed = seed
+        self.rules = rules
+        self.chunk_size = settings.background_chunk_size
+        self.safe_center = safe_center
+        self.safe_radius = safe_radius
+        self.cache = OrderedDict()  # (chunk_x, chunk_y) -> (layers, collision, patterns)
+        self.cache_bytes = 0
+        self.cache_budget = settings.stream_cache_mb * 1024 * 1024
+        self.pending = {}  # (chunk_x, chunk_y) -> Future
+
+    @classmethod
+    def _get_executor(cls, workers):
+        """
+        Obtiene el grupo de procesos de trabajo, creándolo la primera vez.
+
+        Parámetros:
+        - workers: Número de procesos
+
+        Retorna:
+        - ProcessPoolExecutor, o None si no hay procesos (se genera en el hilo actual)
+        """
+        if cls._executor is None and workers > 0:
+            try:
+                cls._executor = ProcessPoolExecutor(max_workers=workers)
+            except Exception as e:
+                print(f"Error creando los procesos de generación, se generará en el hilo principal: {e}")
+                cls._executor = False
+        return cls._executor or None
+
+    def _args(self, key):
+        """
+        Argumentos de generate_chunk para un chunk.
+        """
+        return (self.seed, self.rules, key[0], key[1], self.chunk_size, self.safe_center, self.safe_radius)
+
+    def request(self, keys):
+        """
+        Encarga en segundo plano los chunks que aún no están en caché.
+
+        Parámetros:
+        - keys: Coordenadas (chunk_x, chunk_y) a preparar
+        """
+        executor = self._get_executor(self.settings.stream_workers)
+        if executor is None:
+            return
+        for key in keys:
+            if key not in self.cache and key not in self.pending:
+                self.pending[key] = executor.submit(generate_chunk, *self._args(key))
+
+    def collect(self):
+        """
+        Guarda en caché los chunks que los procesos de trabajo ya han terminado.
+        """
+        for key in [key for key, future in self.pending.items() if future.done()]:
+            future = self.pending.pop(key)
+            try:
+                self._store(key, future.result())
+            except Exception as e:
+                print(f"Error generando el chunk {key}: {e}")
+
+    def get(self, key):
+        """
+        Obtiene los datos de un chunk.
+
+        Parámetros:
+        - key: Coordenadas (chunk_x, chunk_y)
+
+        Retorna:
+        - Tupla (layers, collision, patterns) de generate_chunk
+
+        Usa la caché si puede, espera al proceso de trabajo si el chunk está
+        encargado y, si no, lo genera en el momento.
+        """
+        data = self.cache.get(key)
+        if data is not None:
+            self.cache.move_to_end(key)
+            return data
+        future = self.pending.pop(key, None)
+        data = future.result() if future is not None else generate_chunk(*self._args(key))
+        self._store(key, data)
+        return data
+
+    def _store(self, key, data):
+        """
+        Añade un chunk a la caché y suma su memoria.
+        """
+        self.cache[key] = data
+        self.cache_bytes += self._size(data)
+
+    @staticmethod
+    def _size(data):
+        """
+        Calcula la memoria aproximada de los datos de un chunk en bytes.
+        """
+        layers, collision, patterns = data
+        return sum(layer.nbytes for _, layer in layers) + collision.nbytes + 24 * len(patterns)
+
+    def evict(self, pinned):
+        """
+        Descarta los chunks usados hace más tiempo mientras se supere el presupuesto.
+
+        Parámetros:
+        - pinned: Conjunto de chunks que no se pueden descartar (los de la ventana actual)
+        """
+        if self.cache_bytes <= self.cache_budget:
+            return
+        for key in list(self.cache):
+            if self.cache_bytes <= self.cache_budget:
+                break
+            if key in pinned:
+                continue
+            self.cache_bytes -= self._size(self.cache.pop(key))
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# Cabecera de los archivos de mapa: firma + longitud (uint32) de la cabecera JSON
+MAGIC = b"ESMAP002"
+ALIGNMENT = 64
+# Versión del generador: se sube cada vez que cambia el mapa que genera una misma
+# configuración (tablas de alias, colocación de patrones, orden de las reglas...)
+CACHE_FORMAT_VERSION = 1
+
+
+class MapCache:
+    def __init__(self, settings, generation):
+        """
+        Constructor de la caché de mapas en disco.
+
+        Parámetros:
+        - settings: Configuraciones generales del juego
+        - generation: Diccionario con los parámetros del generador que no están
+          en settings (radio seguro, posición inicial del jugador)
+
+        Inicializa:
+        - Directorio de la caché
+        - Número máximo de mapas guardados
+        """
+        self.settings = settings
+        self.generation = generation
+        self.directory = settings.map_cache_dir
+        self.max_entries = settings.map_cache_max_entries
+
+    def key(self, seed):
+        """
+        Calcula la clave de un mapa.
+
+        Parámetros:
+        - seed: Semilla del mapa
+
+        Retorna:
+        - Hash hexadecimal de todo lo que determina el mapa generado: la
+          semilla, las etapas de generación, el tamaño del mapa, los
+          parámetros del generador y la versión del generador
+        """
+        config = json.dumps({
+            "version": CACHE_FORMAT_VERSION,
+            "seed": seed,
+            "stages": self.settings.generation_stages,
+            "size": [self.settings.map_width, self.settings.map_height],
+            "generation": self.generation,
+        }, sort_keys=True, default=list)
+        return hashlib.sha1(config.encode("utf-8")).hexdigest()
+
+    def path(self, seed):
+        """
+        Obtiene la ruta del archivo de un mapa.
+
+        Parámetros:
+        - seed: Semilla del mapa
+
+        Retorna:
+        - Ruta del archivo dentro del directorio de la caché
+        """
+        return os.path.join(self.directory, f"{self.key(seed)}.map")
+
+    def save(self, seed, layers, collidables, patterns, tiles, prefabs, instances, collision_grid, entrances):
+        """
+        Guarda un mapa generado en formato binario compacto.
+
+        Parámetros:
+        - seed: Semilla del mapa
+        - layers: Lista de arrays uint16 (capa base y decoraciones) con IDs del atlas
+        - collidables: Conjunto de tiles (x, y) colisionables
+        - patterns: Lista de (índice de regla, x, y) con los patrones generados
+        - tiles: Diccionario ID del atlas -> (ruta, tile_size, columnas, tile_id)
+        - prefabs: Lista de ((ruta, tile_size, columnas), forma) de cada prefab usado
+        - instances: Lista de (índice de prefab, x, y) de los patrones colocados
+        - collision_grid: Rejilla booleana de colisiones
+        - entrances: Array (N, 4) con los pares de tiles de las entradas del buscador de caminos
+
+        Los IDs del atlas dependen del orden de carga del proceso, así que se
+        guarda qué tile es cada uno para poder traducirlos al cargar. Las
+        instancias, la rejilla y las entradas se guardan ya calculadas para
+        que cargar no repita la colocación de patrones ni el grafo abstracto.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            arrays = {
+                "layers": np.stack(layers).astype(np.uint16),
+                "collidables": np.array(sorted(collidables), dtype=np.int32).reshape(-1, 2),
+                "patterns": np.array(patterns, dtype=np.int32).reshape(-1, 3),
+                "instances": np.array(instances, dtype=np.int32).reshape(-1, 3),
+                "collision_grid": np.asarray(collision_grid, dtype=bool),
+                "entrances": np.asarray(entrances, dtype=np.int32).reshape(-1, 4),
+            }
+            header = {
+                "seed": seed,
+                "tiles": {str(gid): list(key) for gid, key in tiles.items()},
+                "prefabs": [[list(tileset), shape] for tileset, shape in prefabs],
+                "cluster_size": self.settings.pathfinding_cluster_size,
+                "arrays": {},
+            }
+            offset = 0
+            for name, array in arrays.items():
+                header["arrays"][name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+                offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+            encoded = json.dumps(header).encode("utf-8")
+            data_start = -(-(len(MAGIC) + 4 + len(encoded)) // ALIGNMENT) * ALIGNMENT
+
+            path = self.path(seed)
+            with open(path + ".tmp", "wb") as f:
+                f.write(MAGIC)
+                f.write(len(encoded).to_bytes(4, "little"))
+                f.write(encoded)
+                for name, array in arrays.items():
+                    f.seek(data_start + header["arrays"][name]["offset"])
+                    f.write(array.tobytes())
+            os.replace(path + ".tmp", path)
+            self._prune()
+        except Exception as e:
+            print(f"Error guardando el mapa en caché: {e}")
+
+    def load(self, seed):
+        """
+        Carga un mapa de la caché proyectando el archivo en memoria.
+
+        Parámetros:
+        - seed: Semilla del mapa
+
+        Retorna:
+        - Diccionario con los arrays de solo lectura respaldados por el archivo
+          (layers, collidables, patterns, instances, collision_grid y entrances),
+          tiles y prefabs, o None si no está en caché
+
+        Las entradas solo se devuelven si se calcularon con el mismo
+        pathfinding_cluster_size; si no, "entrances" es None.
+        """
+        path = self.path(seed)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                length = int.from_bytes(f.read(4), "little")
+                header = json.loads(f.read(length).decode("utf-8"))
+            if header["seed"] != seed:
+                return None
+            data_start = -(-(len(MAGIC) + 4 + length) // ALIGNMENT) * ALIGNMENT
+            arrays = {}
+            for name, info in header["arrays"].items():
+                shape = tuple(info["shape"])
+                if 0 in shape:
+                    arrays[name] = np.zeros(shape, dtype=info["dtype"])
+                else:
+                    arrays[name] = np.memmap(path, dtype=info["dtype"], mode="r",
+                                             offset=data_start + info["offset"], shape=shape)
+            arrays["tiles"] = {int(gid): tuple(key) for gid, key in header["tiles"].items()}
+            arrays["prefabs"] = [(tuple(tileset), shape) for tileset, shape in header["prefabs"]]
+            if header["cluster_size"] != self.settings.pathfinding_cluster_size:
+                arrays["entrances"] = None
+            os.utime(path)  # Marcar como usado recientemente para la poda
+            return arrays
+        except Exception as e:
+            print(f"Error cargando el mapa de la caché: {e}")
+            return None
+
+    def _prune(self):
+        """
+        Borra los mapas usados hace más tiempo si se supera max_entries.
+        """
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".map")]
+        files.sort(key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.max_entries)]:
+            os.remove(path)
@@ -0,0 +1,89 @@
+import threading
+from world.tilemap import TileMap
+
+
+class MapPreloader:
+    # Estado compartido por todo el proceso: solo hay un mapa especulativo a la vez
+    _thread = None
+    _tilemap = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def start(cls, settings):
+        """
+        Empieza a generar el mapa de la próxima partida en segundo plano.
+
+        Parámetros:
+        - settings: Configuraciones con las que generar el mapa
+
+        No hace nada si ya hay un mapa listo o una generación en curso.
+        Se llama desde el menú y la pantalla de Game Over, donde el
+        hilo principal apenas trabaja. Los tilesets, tiles y prefabs se
+        registran aquí, en el hilo principal; el hilo de trabajo solo
+        genera los arrays del mapa.
+        """
+        with cls._lock:
+            if cls._tilemap is not None or (cls._thread is not None and cls._thread.is_alive()):
+                return
+            try:
+                tilemap = TileMap(settings)
+                tilemap.prepare_assets()
+            except Exception as e:
+                print(f"Error preparando el mapa en segundo plano: {e}")
+                return
+            cls._thread = threading.Thread(target=cls._generate, args=(tilemap,), daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _generate(cls, tilemap):
+        """
+        Genera los datos del mapa (hilo de trabajo).
+
+        Parámetros:
+        - tilemap: TileMap con los recursos ya preparados en el hilo principal
+
+        No crea superficies ni registra recursos en AssetManager o TileAtlas:
+        eso se hace en take, desde el hilo principal.
+        """
+        try:
+            tilemap.generate_data()
+            with cls._lock:
+                cls._tilemap = tilemap
+            print("Mapa de la próxima partida generado en segundo plano")
+        except Exception as e:
+            print(f"Error generando el mapa en segundo plano: {e}")
+
+    @classmethod
+    def take(cls, settings):
+        """
+        Entrega el mapa generado en segundo plano.
+
+        Parámetros:
+        - settings: Configuraciones del juego que va a usar el mapa
+
+        Retorna:
+        - TileMap ya generado, o None si no se había empezado a generar,
+          la generación falló o se generó con otra semilla que map_seed
+
+        Si la generación sigue en curso espera a que termine en lugar de
+        empezar otra: lo que falta siempre es menos que un mapa completo.
+        Las superficies del mapa y la vista inicial se crean aquí, en el
+        hilo principal.
+        """
+        thread = cls._thread
+        if thread is not None and thread.is_alive():
+            print("Esperando al mapa en segundo plano...")
+            thread.join()
+        with cls._lock:
+            tilemap = cls._tilemap
+            cls._tilemap = None
+            cls._thread = None
+        if tilemap is not None and settings.map_seed is not None and tilemap.seed != settings.map_seed:
+            # Se generó con otra semilla fija: no es el mapa que pide el juego
+            tilemap = None
+        if tilemap is not None:
+            # El mapa pasa a usar las configuraciones del juego que lo recibe
+            tilemap.settings = settings
+            tilemap.build_surfaces()
+            tilemap.prebake_start_view()
+        return tilemap
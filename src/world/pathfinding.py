@@ -0,0 +1,515 @@
+import heapq
+import time
+import numpy as np
+from collections import deque, OrderedDict
+
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class HierarchicalPathfinder:
+    # Vecinos en índices planos por tamaño de cluster, compartidos por todos los buscadores
+    _neighbour_tables = {}
+
+    def __init__(self, tilemap, cluster_size=16, search_radius=3, cache_size=8, previous=None, entrances=None):
+        """
+        Constructor del buscador de caminos jerárquico (HPA*).
+
+        Parámetros:
+        - tilemap: Mapa de tiles con la rejilla de colisiones ya construida
+        - cluster_size: Lado de cada cluster en tiles
+        - search_radius: Radio en clusters alrededor del objetivo que cubre la búsqueda abstracta
+        - cache_size: Número de objetivos cuyos caminos abstractos se mantienen en caché
+        - previous: Buscador de la ventana anterior del mundo infinito, del que
+          se reutilizan los clusters expandidos que no cambian
+        - entrances: Pares de tiles de las entradas ya calculados (de la caché
+          de mapas); si es None se localizan sobre la rejilla de colisiones
+
+        Inicializa:
+        - Rejilla de clusters
+        - Entradas entre clusters vecinos (grafo abstracto)
+        - Cachés de campos locales y de caminos abstractos
+
+        Las distancias dentro de cada cluster se calculan bajo demanda la primera
+        vez que se visita el cluster, por lo que el coste de construcción solo
+        depende del perímetro de los clusters.
+
+        Trabaja en tiles del mundo: la rejilla cubre la ventana cargada del mapa,
+        que en mapas fijos es el mapa completo.
+        """
+        self.settings = tilemap.settings
+        self.collidables = tilemap.collidables
+        self.collision_grid = tilemap.collision_grid  # Rejilla local de la ventana, para construir las entradas
+        self.x0 = tilemap.origin_x
+        self.y0 = tilemap.origin_y
+        self.x1 = self.x0 + self.settings.map_width
+        self.y1 = self.y0 + self.settings.map_height
+        self.cluster_size = cluster_size
+        self.search_radius = search_radius
+        self.cache_size = cache_size
+
+        self.cluster_entrances = {}  # cluster -> lista de tiles de entrada
+        self.inter_edges = {}  # tile de entrada -> lista de tiles vecinos en otros clusters
+        self.entrance_fields = {}  # tile de entrada -> {tile: distancia} dentro de su cluster
+        self.intra_edges = {}  # tile de entrada -> lista de (entrada, coste) dentro de su cluster
+        self.goal_cache = OrderedDict()  # (cluster objetivo, entradas alcanzables y su distancia al objetivo) -> distancias abstractas
+        self.goal_field_cache = OrderedDict()  # tile objetivo -> campo local dentro de su cluster
+        self.pending_clusters = deque()  # Clusters pendientes de expandir por prepare_step
+        self.pending_goal = None  # Objetivo cuyo camino abstracto se calcula al vaciar la cola
+
+        self.entrance_pairs = entrances if entrances is not None else self._find_entrances()  # Entradas como array, para la caché
+        self._add_entrances(self.entrance_pairs)
+        if previous is not None:
+            self._reuse_clusters(previous)
+
+    def _is_walkable(self, x, y):
+        """
+        Verifica si un tile es transitable.
+
+        Parámetros:
+        - x, y: Coordenadas del tile
+
+        Retorna:
+        - True si está dentro del mapa y no es colisionable
+        """
+        return self.x0 <= x < self.x1 and self.y0 <= y < self.y1 and (x, y) not in self.collidables
+
+    def _cluster_of(self, x, y):
+        """
+        Obtiene el cluster al que pertenece un tile.
+
+        Parámetros:
+        - x, y: Coordenadas del tile
+
+        Retorna:
+        - Tupla (cluster_x, cluster_y)
+        """
+        return (x // self.cluster_size, y // self.cluster_size)
+
+    def _cluster_bounds(self, cluster):
+        """
+        Calcula los límites de un cluster en tiles.
+
+        Parámetros:
+        - cluster: Tupla (cluster_x, cluster_y)
+
+        Retorna:
+        - Tupla (x0, y0, x1, y1) con límites exclusivos en x1, y1
+        """
+        x0 = cluster[0] * self.cluster_size
+        y0 = cluster[1] * self.cluster_size
+        return (max(x0, self.x0), max(y0, self.y0),
+                min(x0 + self.cluster_size, self.x1), min(y0 + self.cluster_size, self.y1))
+
+    def _add_entrances(self, pairs):
+        """
+        Registra las entradas entre clusters a partir de sus pares de tiles.
+
+        Parámetros:
+        - pairs: Array (N, 4) con (ax, ay, bx, by) de cada par de tiles
+          adyacentes a ambos lados de un borde, en orden de recorrido
+        """
+        tiles = pairs.reshape(-1, 2)
+        others = pairs[:, [2, 3, 0, 1]].reshape(-1, 2)
+        clusters = tiles // self.cluster_size
+        for tile, other, cluster in zip(map(tuple, tiles.tolist()), map(tuple, others.tolist()),
+                                        map(tuple, clusters.tolist())):
+            edges = self.inter_edges.get(tile)
+            if edges is None:
+                self.inter_edges[tile] = [other]
+                self.cluster_entrances.setdefault(cluster, []).append(tile)
+            else:
+                edges.append(other)
+
+    def _segment_entrances(self, pairs, start):
+        """
+        Calcula dónde van las entradas a lo largo de un borde entre clusters.
+
+        Parámetros:
+        - pairs: Array booleano, True donde los dos tiles a ambos lados del borde son transitables
+        - start: Coordenada del mundo del primer elemento del borde
+
+        Retorna:
+        - Array ordenado de coordenadas del mundo a lo largo del borde donde colocar una entrada
+
+        Los tramos continuos transitables se cortan en los límites de cluster.
+        Los tramos cortos tienen una entrada en el centro; los largos una en cada extremo.
+        """
+        boundary = (np.arange(start, start + len(pairs)) % self.cluster_size) == 0
+        previous = np.concatenate(([False], pairs[:-1]))
+        following = np.concatenate((pairs[1:], [False]))
+        starts = np.flatnonzero(pairs & (~previous | boundary))
+        ends = np.flatnonzero(pairs & (~following | np.concatenate((boundary[1:], [True])))) + 1
+        short = ends - starts < 6
+        first = np.where(short, starts + (ends - starts) // 2, starts)
+        last = np.where(short, -1, ends - 1)
+        entrances = np.stack((first, last), axis=1).ravel()
+        return entrances[entrances >= 0] + start
+
+    def _find_entrances(self):
+        """
+        Recorre los bordes entre clusters y localiza las entradas del grafo abstracto.
+
+        Retorna:
+        - Array (N, 4) con los pares de tiles de cada entrada, en orden de recorrido
+
+        Cada borde se evalúa de una vez sobre la rejilla de colisiones del mapa.
+        """
+        size = self.cluster_size
+        walkable = ~self.collision_grid
+        pairs = []
+        # Bordes verticales (entre clusters de izquierda a derecha)
+        for x in range(self.x0 // size * size + size - 1, self.x1 - 1, size):
+            column = x - self.x0
+            ys = self._segment_entrances(walkable[:, column] & walkable[:, column + 1], self.y0)
+            pairs.append(np.stack((np.full_like(ys, x), ys, np.full_like(ys, x + 1), ys), axis=1))
+
+        # Bordes horizontales (entre clusters de arriba a abajo)
+        for y in range(self.y0 // size * size + size - 1, self.y1 - 1, size):
+            row = y - self.y0
+            xs = self._segment_entrances(walkable[row] & walkable[row + 1], self.x0)
+            pairs.append(np.stack((xs, np.full_like(xs, y), xs, np.full_like(xs, y + 1)), axis=1))
+        if not pairs:
+            return np.zeros((0, 4), dtype=np.int64)
+        return np.concatenate(pairs)
+
+    def _cluster_cells(self, bounds):
+        """
+        Obtiene la parte de la rejilla de colisiones que cubre un cluster.
+
+        Parámetros:
+        - bounds: Límites (x0, y0, x1, y1) del cluster en tiles del mundo
+
+        Retorna:
+        - Vista booleana de la rejilla de la ventana, True en los tiles colisionables
+        """
+        x0, y0, x1, y1 = bounds
+        return self.collision_grid[y0 - self.y0:y1 - self.y0, x0 - self.x0:x1 - self.x0]
+
+    def _reuse_clusters(self, previous):
+        """
+        Copia los clusters ya expandidos de un buscador anterior que no han cambiado.
+
+        Parámetros:
+        - previous: Buscador construido con la ventana anterior del mundo infinito
+
+        Los campos de un cluster solo dependen de sus límites, de sus tiles
+        colisionables y de sus entradas, así que se reutiliza si los tres
+        coinciden en ambas ventanas. Así recentrar la ventana solo repite los
+        BFS de los clusters que han cambiado.
+        """
+        if previous.cluster_size != self.cluster_size:
+            return
+        for cluster, entrances in self.cluster_entrances.items():
+            if (previous.cluster_entrances.get(cluster) != entrances or
+                    entrances[0] not in previous.entrance_fields):
+                continue
+            bounds = self._cluster_bounds(cluster)
+            if (previous._cluster_bounds(cluster) != bounds or
+                    not np.array_equal(self._cluster_cells(bounds), previous._cluster_cells(bounds))):
+                continue
+            for entrance in entrances:
+                self.entrance_fields[entrance] = previous.entrance_fields[entrance]
+                self.intra_edges[entrance] = previous.intra_edges[entrance]
+
+    @classmethod
+    def _neighbour_table(cls, width, height):
+        """
+        Obtiene los vecinos de cada celda de una rejilla en índices planos.
+
+        Parámetros:
+        - width, height: Tamaño de la rejilla
+
+        Retorna:
+        - Lista con la tupla de índices vecinos de cada celda
+
+        Se calcula una vez por tamaño (casi todos los clusters miden lo mismo).
+        """
+        key = (width, height)
+        if key not in cls._neighbour_tables:
+            table = []
+            for y in range(height):
+                for x in range(width):
+                    index = y * width + x
+                    table.append(tuple(index + dx + dy * width for dx, dy in NEIGHBOURS
+                                       if 0 <= x + dx < width and 0 <= y + dy < height))
+            cls._neighbour_tables[key] = table
+        return cls._neighbour_tables[key]
+
+    def _cluster_grid(self, cluster):
+        """
+        Prepara un cluster para calcular campos de distancias.
+
+        Parámetros:
+        - cluster: Tupla (cluster_x, cluster_y)
+
+        Retorna:
+        - Tupla (límites, celdas bloqueadas, tiles, vecinos) en índices planos,
+          compartida por todos los BFS del cluster
+        """
+        bounds = self._cluster_bounds(cluster)
+        x0, y0, x1, y1 = bounds
+        blocked = self._cluster_cells(bounds).ravel().tolist()
+        tiles = [(x, y) for y in range(y0, y1) for x in range(x0, x1)]
+        return bounds, blocked, tiles, self._neighbour_table(x1 - x0, y1 - y0)
+
+    def _local_field(self, origin, grid=None):
+        """
+        Calcula distancias desde un tile a todo su cluster mediante BFS.
+
+        Parámetros:
+        - origin: Tile de origen
+        - grid: Resultado de _cluster_grid para el cluster del origen (se calcula si es None)
+
+        Retorna:
+        - Diccionario {tile: distancia} restringido al cluster del origen
+
+        El BFS recorre índices planos sobre la parte de la rejilla de
+        colisiones del cluster; las tuplas de los tiles se comparten entre
+        todos los campos del cluster.
+        """
+        if grid is None:
+            grid = self._cluster_grid(self._cluster_of(*origin))
+        (x0, y0, x1, y1), blocked, tiles, neighbours = grid
+        if not (x0 <= origin[0] < x1 and y0 <= origin[1] < y1):
+            return {origin: 0}
+        distances = [-1] * len(blocked)
+        start = (origin[1] - y0) * (x1 - x0) + (origin[0] - x0)
+        distances[start] = 0
+        queue = [start]
+        for index in queue:
+            distance = distances[index] + 1
+            for neighbour in neighbours[index]:
+                if distances[neighbour] < 0 and not blocked[neighbour]:
+                    distances[neighbour] = distance
+                    queue.append(neighbour)
+        return {tiles[index]: distances[index] for index in queue}
+
+    def _expand_cluster(self, cluster):
+        """
+        Calcula bajo demanda los campos y aristas internas de un cluster.
+
+        Parámetros:
+        - cluster: Tupla (cluster_x, cluster_y)
+        """
+        entrances = self.cluster_entrances.get(cluster, [])
+        if not entrances or entrances[0] in self.entrance_fields:
+            return
+        grid = self._cluster_grid(cluster)
+        for entrance in entrances:
+            self.entrance_fields[entrance] = self._local_field(entrance, grid)
+        for entrance in entrances:
+            field = self.entrance_fields[entrance]
+            self.intra_edges[entrance] = [
+                (other, field[other]) for other in entrances
+                if other != entrance and other in field
+            ]
+
+    def _goal_field(self, goal):
+        """
+        Obtiene el campo de distancias hacia un objetivo dentro de su cluster.
+
+        Parámetros:
+        - goal: Tile objetivo
+
+        Retorna:
+        - Diccionario {tile: distancia} del cluster del objetivo
+        """
+        if goal in self.goal_field_cache:
+            self.goal_field_cache.move_to_end(goal)
+            return self.goal_field_cache[goal]
+        field = self._local_field(goal)
+        self.goal_field_cache[goal] = field
+        if len(self.goal_field_cache) > self.cache_size:
+            self.goal_field_cache.popitem(last=False)
+        return field
+
+    def _abstract_distances(self, goal, goal_field):
+        """
+        Obtiene el camino abstracto hacia un objetivo, desde la caché si existe.
+
+        Parámetros:
+        - goal: Tile objetivo
+        - goal_field: Campo de distancias del objetivo dentro de su cluster
+
+        Retorna:
+        - Diccionario {entrada: distancia} hasta el objetivo, pasando por las
+          entradas del cluster objetivo conectadas con él
+
+        Ejecuta Dijkstra inverso sobre el grafo abstracto limitado a
+        search_radius clusters alrededor del objetivo, de modo que el coste
+        no crece con el tamaño del mapa. Cada entrada del cluster objetivo
+        parte de su distancia al objetivo dentro del cluster, así que el camino
+        elegido es el más corto hasta el objetivo y no hasta la entrada más
+        cercana. Se cachea por cluster y distancias de sus entradas, así que
+        solo se recalcula cuando el objetivo cambia de tile.
+        """
+        goal_cluster = self._cluster_of(*goal)
+        seeds = tuple((entrance, goal_field[entrance]) for entrance in self.cluster_entrances.get(goal_cluster, [])
+                      if entrance in goal_field)
+        key = (goal_cluster, seeds)
+        if key in self.goal_cache:
+            self.goal_cache.move_to_end(key)
+            return self.goal_cache[key]
+
+        distances = {}
+        heap = []
+        for entrance, offset in seeds:
+            if offset < distances.get(entrance, float('inf')):
+                distances[entrance] = offset
+                heapq.heappush(heap, (offset, entrance))
+
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > distances.get(node, float('inf')):
+                continue
+            cluster = self._cluster_of(*node)
+            self._expand_cluster(cluster)
+            neighbours = [(other, 1) for other in self.inter_edges.get(node, [])]
+            neighbours.extend(self.intra_edges.get(node, []))
+            for other, cost in neighbours:
+                other_cluster = self._cluster_of(*other)
+                if (other_cluster == goal_cluster or
+                        abs(other_cluster[0] - goal_cluster[0]) > self.search_radius or
+                        abs(other_cluster[1] - goal_cluster[1]) > self.search_radius):
+                    continue
+                new_distance = distance + cost
+                if new_distance < distances.get(other, float('inf')):
+                    distances[other] = new_distance
+                    heapq.heappush(heap, (new_distance, other))
+
+        self.goal_cache[key] = distances
+        if len(self.goal_cache) > self.cache_size:
+            self.goal_cache.popitem(last=False)
+        return distances
+
+    def prepare(self, goal):
+        """
+        Encola los clusters alrededor de un objetivo para expandirlos poco a poco.
+
+        Parámetros:
+        - goal: Tile objetivo (normalmente la posición inicial del jugador)
+
+        No calcula nada: prepare_step expande los clusters encolados, del más
+        cercano al objetivo al más lejano, con un presupuesto de tiempo por frame.
+        Así la generación del mapa no paga los BFS de todos los clusters y la
+        primera consulta de la partida encuentra la mayor parte ya expandida.
+        Se encola un anillo más que search_radius para que cambiar de cluster
+        tampoco tenga que expandir los nuevos.
+        """
+        cx, cy = self._cluster_of(*goal)
+        radius = self.search_radius + 1
+        clusters = [(cx + dx, cy + dy)
+                    for dy in range(-radius, radius + 1)
+                    for dx in range(-radius, radius + 1)]
+        clusters.sort(key=lambda cluster: max(abs(cluster[0] - cx), abs(cluster[1] - cy)))
+        self.pending_clusters = deque(clusters)
+        self.pending_goal = goal
+
+    def prepare_step(self, budget_ms):
+        """
+        Expande clusters encolados por prepare hasta agotar el presupuesto.
+
+        Parámetros:
+        - budget_ms: Tiempo máximo en milisegundos para este frame
+
+        Siempre expande al menos un cluster. Al vaciar la cola calcula el camino
+        abstracto hacia el objetivo, que ya no necesita expandir nada.
+        """
+        if not self.pending_clusters:
+            return
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        while self.pending_clusters:
+            self._expand_cluster(self.pending_clusters.popleft())
+            if time.perf_counter() >= deadline:
+                return
+        goal = self.pending_goal
+        self.pending_goal = None
+        if self._is_walkable(*goal):
+            self._abstract_distances(goal, self._goal_field(goal))
+
+    def _descend(self, field, tile):
+        """
+        Avanza un paso bajando por un campo de distancias.
+
+        Parámetros:
+        - field: Diccionario {tile: distancia}
+        - tile: Tile actual
+
+        Retorna:
+        - Tile vecino con menor distancia o el propio tile si no hay ninguno mejor
+        """
+        best = tile
+        best_distance = field.get(tile, float('inf'))
+        x, y = tile
+        for dx, dy in NEIGHBOURS:
+            neighbour = (x + dx, y + dy)
+            distance = field.get(neighbour)
+            if distance is not None and distance < best_distance:
+                best, best_distance = neighbour, distance
+        return best
+
+    def next_tile(self, start, goal):
+        """
+        Obtiene el siguiente tile del camino entre dos tiles.
+
+        Parámetros:
+        - start: Tile de origen
+        - goal: Tile objetivo
+
+        Retorna:
+        - Tile al que moverse a continuación
+        - None si no hay camino dentro del radio de búsqueda
+
+        Solo se refina el tramo dentro del cluster de origen; el resto del
+        camino se resuelve sobre el grafo abstracto cacheado. Fuera del
+        cluster objetivo el camino lleva a la entrada que deja más cerca del
+        objetivo y, una vez dentro, se sigue el campo exacto hacia él.
+        """
+        if start == goal:
+            return goal
+        goal_field = self._goal_field(goal)
+        if start in goal_field:
+            return self._descend(goal_field, start)
+        distances = self._abstract_distances(goal, goal_field)
+
+        cluster = self._cluster_of(*start)
+        self._expand_cluster(cluster)
+        best_cost = float('inf')
+        best_step = None
+        for entrance in self.cluster_entrances.get(cluster, []):
+            if entrance == start or entrance not in distances:
+                continue
+            local = self.entrance_fields[entrance].get(start)
+            if local is not None and local + distances[entrance] < best_cost:
+                best_cost = local + distances[entrance]
+                best_step = self._descend(self.entrance_fields[entrance], start)
+        # Si el origen es una entrada, puede cruzar directamente al cluster vecino
+        for other in self.inter_edges.get(start, []):
+            if other in distances and 1 + distances[other] < best_cost:
+                best_cost = 1 + distances[other]
+                best_step = other
+        return best_step
+
+    def next_waypoint(self, start_pos, goal_pos):
+        """
+        Obtiene el siguiente punto de paso en coordenadas del mundo.
+
+        Parámetros:
+        - start_pos: Posición (x, y) de origen en píxeles
+        - goal_pos: Posición (x, y) objetivo en píxeles
+
+        Retorna:
+        - Centro en píxeles del siguiente tile del camino
+        - None si no hay camino o el origen está fuera del mapa
+        """
+        tile_size = self.settings.tile_size
+        start = (int(start_pos[0] // tile_size), int(start_pos[1] // tile_size))
+        goal = (int(goal_pos[0] // tile_size), int(goal_pos[1] // tile_size))
+        if not (self._is_walkable(*start) and self._is_walkable(*goal)):
+            return None
+        step = self.next_tile(start, goal)
+        if step is None:
+            return None
+        if step == goal:
+            return goal_pos
+        return ((step[0] + 0.5) * tile_size, (step[1] + 0.5) * tile_size)
@@ -1,41 +1,133 @@
+import threading
 import pygame
+import numpy as np
+from collections import OrderedDict
 
 class Pattern:
-    def __init__(self, tileset, shape):
+    # Prefabs compartidos por tileset y forma (sirven para cualquier zoom)
+    _shared = {}
+    # Protege _shared: MapPreloader crea variantes de prefab desde su hilo de trabajo
+    _lock = threading.Lock()
+
+    def __init__(self, atlas, tileset, tileset_info, shape):
         """
-        Constructor de la clase Pattern.
-        
+        Constructor del prefab de un patrón.
+
         Parámetros:
-        - tileset: Conjunto de tiles a utilizar en el patrón
+        - atlas: TileAtlas donde se internan los tiles del patrón
+        - tileset: Superficie con el tileset completo
+        - tileset_info: Información del tileset (ruta, tamaño, columnas, filas)
         - shape: Matriz que define la forma y configuración del patrón
-        
+
         La matriz shape puede contener:
         - Diccionarios con {'tile': id, 'collidable': bool}
         - Números enteros representando IDs de tiles sin colisión
         - Ceros para espacios vacíos
+
+        Inicializa:
+        - Huella (celdas no vacías) y máscara de colisión como arrays booleanos
+        - IDs del atlas de cada celda
+        - Caché LRU de superficies compuestas por (tamaño de tile, transparencia)
         """
-        self.tileset = tileset
+        self.atlas = atlas
+        self.tileset_info = tileset_info  # Para identificar el tileset al guardar el prefab en la caché de mapas
         self.shape = shape
+        self.height = len(shape)
+        self.width = len(shape[0])
+        self.footprint = np.zeros((self.height, self.width), dtype=bool)
+        self.collision_mask = np.zeros((self.height, self.width), dtype=bool)
+        self.cells = []  # (x, y, ID del atlas, colisionable) de cada celda no vacía
 
-    def apply(self, tilemap, position):
-        """
-        Aplica el patrón sobre el tilemap en una posición específica.
-        
-        Parámetros:
-        - tilemap: Mapa de tiles donde aplicar el patrón
-        - position: Tupla (x, y) indicando la posición inicial
-        
-        Proceso:
-        - Recorre la matriz del patrón celda por celda
-        - Si la celda es un diccionario, usa sus propiedades
-        - Si la celda es un número != 0, coloca el tile sin colisión
-        - Ignora las celdas con valor 0
-        """
-        for y, row in enumerate(self.shape):
+        for y, row in enumerate(shape):
             for x, cell in enumerate(row):
                 if isinstance(cell, dict):
                     tile_id = cell["tile"]
-                    collidable = cell["collidable"]
-                    tilemap.set_tile(position[0] + x, position[1] + y, self.tileset, tile_id, collidable)
+                    collidable = bool(cell["collidable"])
                 elif cell != 0:
-                    tilemap.set_tile(position[0] + x, position[1] + y, self.tileset, cell, False)
\ No newline at end of file
+                    tile_id = cell
+                    collidable = False
+                else:
+                    continue
+                self.footprint[y, x] = True
+                self.collision_mask[y, x] = collidable
+                self.cells.append((x, y, atlas.intern(tileset, tileset_info, tile_id), collidable))
+        self.surfaces = OrderedDict()
+
+    @staticmethod
+    def _shape_key(shape):
+        """
+        Convierte la matriz del patrón en una tupla que se puede usar como clave.
+        """
+        return tuple(
+            tuple((cell["tile"], bool(cell["collidable"])) if isinstance(cell, dict) else cell for cell in row)
+            for row in shape
+        )
+
+    @classmethod
+    def shared(cls, atlas, tileset, tileset_info, shape):
+        """
+        Obtiene el prefab de un patrón, creándolo la primera vez.
+
+        Parámetros:
+        - atlas: TileAtlas donde se internan los tiles
+        - tileset: Superficie con el tileset completo
+        - tileset_info: Información del tileset
+        - shape: Matriz del patrón
+
+        Retorna:
+        - El prefab compartido por todas las instancias del patrón,
+          también entre mapas regenerados
+        """
+        key = (tileset_info.path, tileset_info.tile_size, tileset_info.columns, cls._shape_key(shape))
+        with cls._lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(atlas, tileset, tileset_info, shape)
+            return cls._shared[key]
+
+    def overlay(self, scaled_size, alpha):
+        """
+        Obtiene la superficie con la que se dibuja el patrón en la capa overlay.
+
+        Parámetros:
+        - scaled_size: Tamaño en píxeles de cada tile ya escalado al zoom
+        - alpha: Transparencia de los tiles no colisionables (0-255)
+
+        Retorna:
+        - Superficie con todos los tiles compuestos: los colisionables opacos
+          y el resto con la transparencia indicada
+
+        Se compone una sola vez por zoom y transparencia. Se conservan como
+        mucho dos superficies por cada resolución del atlas.
+        """
+        if alpha >= 255 or all(collidable for _, _, _, collidable in self.cells):
+            alpha = 255
+        key = (scaled_size, alpha)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        tiles = self.atlas.scaled(scaled_size)
+        surface = pygame.Surface((self.width * scaled_size, self.height * scaled_size), pygame.SRCALPHA)
+        for x, y, gid, collidable in self.cells:
+            tile_surface = tiles[gid]
+            if not collidable and alpha < 255:
+                tile_surface = tile_surface.copy()
+                tile_surface.set_alpha(alpha)
+            surface.blit(tile_surface, (x * scaled_size, y * scaled_size))
+        self.surfaces[key] = surface
+        while len(self.surfaces) > 2 * self.atlas.max_levels:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def without(self, cells):
+        """
+        Obtiene la forma del patrón sin algunas de sus celdas.
+
+        Parámetros:
+        - cells: Array booleano (alto, ancho), True en las celdas a vaciar
+
+        Retorna:
+        - Nueva matriz de forma, para crear una variante del prefab
+        """
+        return [[0 if cells[y, x] else cell for x, cell in enumerate(row)] for y, row in enumerate(self.shape)]
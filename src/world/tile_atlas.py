@@ -0,0 +1,124 @@
+import pygame
+import numpy as np
+from collections import OrderedDict
+
+
+class TileAtlas:
+    # Atlas compartido por todo el proceso (los IDs no dependen del zoom)
+    _shared = None
+
+    def __init__(self, max_levels=3):
+        """
+        Constructor del atlas de tiles multirresolución.
+
+        Parámetros:
+        - max_levels: Número máximo de resoluciones (zooms) escaladas en memoria
+
+        Inicializa:
+        - Lista de tiles sin escalar indexada por ID global (el 0 significa "sin tile")
+        - Diccionario de internado (tileset, tile) -> ID global
+        - Caché LRU de resoluciones: tamaño escalado -> lista de superficies por ID
+        - Color medio de cada tile para el minimapa
+        """
+        self.tiles = [None]
+        self.ids = {}
+        self.colors = np.zeros((1, 4), dtype=np.float32)  # (r, g, b, opacidad media) por ID
+        self.levels = OrderedDict()
+        self.max_levels = max_levels
+
+    @classmethod
+    def shared(cls):
+        """
+        Obtiene el atlas compartido, creándolo la primera vez.
+
+        Retorna:
+        - El atlas del proceso
+
+        Los mapas regenerados reutilizan el mismo atlas, así que cada tile
+        se extrae una sola vez por tileset y se escala una sola vez por zoom.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def intern(self, tileset, tileset_info, tile_id):
+        """
+        Obtiene el ID global de un tile, extrayéndolo del tileset si es nuevo.
+
+        Parámetros:
+        - tileset: Superficie con el tileset completo
+        - tileset_info: Información del tileset (ruta, tamaño, columnas, filas)
+        - tile_id: ID del tile dentro del tileset
+
+        Retorna:
+        - ID global (uint16) del tile en el atlas, válido en cualquier zoom
+        """
+        key = (tileset_info.path, tileset_info.tile_size, tileset_info.columns, tile_id)
+        gid = self.ids.get(key)
+        if gid is not None:
+            return gid
+
+        tile_x = (tile_id % tileset_info.columns) * tileset_info.tile_size
+        tile_y = (tile_id // tileset_info.columns) * tileset_info.tile_size
+        tile_surface = pygame.Surface(
+            (tileset_info.tile_size, tileset_info.tile_size),
+            pygame.SRCALPHA
+        )
+        tile_surface.blit(
+            tileset,
+            (0, 0),
+            (tile_x, tile_y, tileset_info.tile_size, tileset_info.tile_size)
+        )
+        gid = len(self.tiles)
+        if gid > 0xFFFF:
+            raise ValueError("El atlas de tiles ha superado el máximo de IDs uint16")
+        self.tiles.append(tile_surface)
+        self.ids[key] = gid
+        return gid
+
+    def average_colors(self):
+        """
+        Obtiene el color medio de cada tile.
+
+        Retorna:
+        - Array (IDs, 4) con el color medio ponderado por alfa (0-255) y la
+          opacidad media (0-1) de cada tile; el ID 0 es transparente
+
+        Solo calcula los tiles internados desde la última consulta.
+        """
+        if len(self.colors) < len(self.tiles):
+            new_colors = []
+            for tile in self.tiles[len(self.colors):]:
+                alpha = pygame.surfarray.array_alpha(tile).astype(np.float32) / 255
+                rgb = pygame.surfarray.array3d(tile).astype(np.float32)
+                weight = alpha.sum()
+                color = (rgb * alpha[..., None]).sum(axis=(0, 1)) / weight if weight else np.zeros(3)
+                new_colors.append((*color, alpha.mean()))
+            self.colors = np.vstack([self.colors, np.array(new_colors, dtype=np.float32)])
+        return self.colors
+
+    def scaled(self, scaled_size):
+        """
+        Obtiene los tiles escalados a un tamaño.
+
+        Parámetros:
+        - scaled_size: Tamaño en píxeles de cada tile ya escalado al zoom
+
+        Retorna:
+        - Lista de superficies indexada por ID global
+
+        La resolución se crea la primera vez que se pide y solo escala los
+        tiles internados desde la última consulta. Si se superan max_levels
+        se descarta la resolución usada hace más tiempo.
+        """
+        surfaces = self.levels.get(scaled_size)
+        if surfaces is None:
+            surfaces = [None]
+            self.levels[scaled_size] = surfaces
+        else:
+            self.levels.move_to_end(scaled_size)
+        for tile in self.tiles[len(surfaces):]:
+            surfaces.append(pygame.transform.scale(tile, (scaled_size, scaled_size)))
+        while len(self.levels) > self.max_levels:
+            self.levels.popitem(last=False)
+        return surfaces
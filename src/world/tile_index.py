@@ -0,0 +1,50 @@
+from bisect import bisect_left
+
+
+class TileIndex:
+    def __init__(self, tiles, map_height):
+        """
+        Constructor del índice espacial de patrones por filas.
+
+        Parámetros:
+        - tiles: Lista de patrones colocados (con atributos x, depth)
+        - map_height: Número de filas del índice
+
+        Inicializa:
+        - Un cubo por fila de profundidad con sus patrones ordenados por X
+        - Las coordenadas X de cada fila para búsquedas binarias
+
+        El orden dentro de cada fila es estable, así que los patrones que
+        comparten posición conservan su orden de inserción.
+        """
+        self.rows = [[] for _ in range(map_height)]
+        for tile in tiles:
+            if 0 <= tile.depth < map_height:
+                self.rows[tile.depth].append(tile)
+        for row in self.rows:
+            row.sort(key=lambda t: t.x)
+        self.row_xs = [[tile.x for tile in row] for row in self.rows]
+
+    def query(self, start_x, start_y, end_x, end_y):
+        """
+        Obtiene los patrones de un rango de tiles ya en orden de dibujo.
+
+        Parámetros:
+        - start_x, start_y: Esquina superior izquierda (incluida) de X y profundidad
+        - end_x, end_y: Esquina inferior derecha (excluida) de X y profundidad
+
+        Retorna:
+        - Lista de patrones ordenados por profundidad y después por X
+
+        Solo recorre las filas del rango y, dentro de cada fila, localiza
+        el tramo visible con búsqueda binaria sin tocar patrones fuera de pantalla.
+        """
+        visible = []
+        for y in range(max(0, start_y), min(len(self.rows), end_y)):
+            xs = self.row_xs[y]
+            if not xs:
+                continue
+            first = bisect_left(xs, start_x)
+            last = bisect_left(xs, end_x, first)
+            visible.extend(self.rows[y][first:last])
+        return visible
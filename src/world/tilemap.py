@@ -1,8 +1,19 @@
 import pygame
 import random
+import time
+import numpy as np
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 from world.pattern import Pattern
+from world.pathfinding import HierarchicalPathfinder
+from world.tile_index import TileIndex
+from world.tile_atlas import TileAtlas
+from world.alias_table import AliasTable
+from world.chunk_generator import compile_rules
+from world.chunk_stream import ChunkStream
+from world.map_cache import MapCache
+from managers.asset_manager import AssetManager
 
 @dataclass
 class TilesetInfo:
@@ -27,13 +38,12 @@ class GenerationStage:
     rules: List[GenerationRule]
 
 @dataclass
-class Tile:
-    surface: pygame.Surface
+class PatternInstance:
+    prefab: Pattern
     x: int
     y: int
-    layer: int
-    collidable: bool
-    is_pattern: bool
+    depth: int  # Fila inferior del patrón, única clave de orden de dibujo
+    overlay_surface: Optional[pygame.Surface] = None  # Superficie con la que se dibuja en la capa overlay
 
 class TileMap:
     def __init__(self, settings):
@@ -44,7 +54,7 @@ class TileMap:
         - settings: Configuraciones del juego
         
         Inicializa:
-        - Semilla aleatoria para generación
+        - Semilla de generación (settings.map_seed o aleatoria)
         - Capas del mapa (base, media, patrones)
         - Sistema de colisiones
         - Cámara y caché
@@ -53,19 +63,51 @@ class TileMap:
         try:
             print("Inicializando TileMap...")
             self.settings = settings
-            self.seed = random.randint(0, 999999)
-            self.base_layer = [[None for _ in range(settings.map_width)] for _ in range(settings.map_height)]  # Capa base
-            self.medium_layer = []  # Lista de tiles de capas posteriores a la base
-            self.pattern_tiles = []  # Lista de tiles de patrones
-            self.collidables = set()
+            self.seed = settings.map_seed if settings.map_seed is not None else random.randint(0, 999999)
+            self.atlas = TileAtlas.shared()  # Tiles internados por ID, escalados por zoom bajo demanda
+            self.atlas.max_levels = settings.zoom_cache_levels
+            self.base_layer = np.zeros((settings.map_height, settings.map_width), dtype=np.uint16)  # Capa base (IDs del atlas, 0 = vacío)
+            self.decoration_layers = []  # Una rejilla de IDs por cada regla aleatoria posterior a la base
+            self.pattern_instances = []  # Patrones colocados, cada uno con su prefab compartido
+            self.collidables = set()  # Tiles colisionables en coordenadas del mundo
             self.stages = self._create_stages()
             self.camera_x = 0
             self.camera_y = 0
             self.player_start_pos = (settings.map_width // 2, settings.map_height // 2)  # Posición inicial del jugador
             self.safe_radius = 5  # Radio seguro alrededor del jugador donde no se generarán colisiones
+            self.safe_mask = None  # Rejilla booleana de las celdas dentro del radio seguro
+            self.occupancy = None  # Celdas ocupadas por patrones o dentro de la zona segura
+            self.rng = None  # Generador de NumPy sembrado con self.seed al generar
             self.generated_patterns = []  # Lista para almacenar los patrones generados
-            self.scaled_tile_cache = {}  # Caché para almacenar tiles escalados
-            self.base_layer_surface = None  # Superficie de caché para la capa base
+            self.chunk_size = settings.background_chunk_size  # Lado de cada chunk de fondo en tiles
+            self.chunk_cache_budget = settings.background_chunk_cache_mb * 1024 * 1024  # Memoria máxima de chunks
+            self.chunk_cache = OrderedDict()  # (chunk_x, chunk_y, zoom) -> superficie pre-renderizada (LRU)
+            self.chunk_cache_bytes = 0
+            self.pattern_index = None  # Índice por filas de los patrones colocados, ordenado por profundidad
+            self.pattern_extent = (1, 1)  # Ancho y alto en tiles del mayor patrón colocado
+            self.overlay_alpha = settings.overlay_alpha  # Transparencia de los tiles de patrón no colisionables
+            self.background_buffer = None  # Fondo del frame anterior alineado con la cámara
+            self.background_buffer_camera = None  # Cámara (en píxeles de pantalla) con la que se dibujó el buffer
+            self.background_buffer_zoom = None
+            self.line_of_sight_cache = {}  # Caché de visibilidad por par de tiles, se limpia cada frame
+            self.pathfinder = None  # Buscador de caminos jerárquico, se construye al generar
+            self.collision_grid = None  # Rejilla booleana de colisiones para consultas en lote
+            self.collision_sum = None  # Tabla de sumas acumuladas de la rejilla de colisiones
+            self.minimap_surface = None  # Terreno reducido a un píxel por tile para el minimapa
+            self.origin_x = 0  # Origen en tiles del mundo de la ventana cargada (siempre 0 en mapas fijos)
+            self.origin_y = 0
+            self.chunk_stream = None  # Flujo de chunks del mundo infinito (solo con world_streaming)
+            self.stream_rules = []  # Reglas en orden de aplicación, indexadas como en compile_rules
+            self.compiled_rules = []  # Las mismas reglas compiladas para los procesos de trabajo
+            self.rule_gids = {}  # Índice de regla aleatoria -> tabla tile_id + 1 -> ID del atlas
+            self.stream_layers = {}  # Índice de regla aleatoria -> capa de la ventana que rellena
+            self.pattern_margin = 0  # Chunks a la izquierda y encima de la ventana cuyos patrones pueden entrar en ella
+            self.placed_chunks = {}  # Chunk con sus patrones ya colocados -> (tiles colisionables, instancias, patrones generados)
+            self.prefetch_keys = []  # Chunks encargados por delante del jugador, cuyos patrones se colocan de antemano
+            # Mapas ya generados en disco; solo con semilla fija, que es la única que se vuelve a pedir
+            self.map_cache = None
+            if settings.map_cache_enabled and settings.map_seed is not None:
+                self.map_cache = MapCache(settings, {"safe_radius": self.safe_radius, "player_start": self.player_start_pos})
             print("TileMap inicializado correctamente")
         except Exception as e:
             print(f"Error inicializando TileMap: {e}")
@@ -112,74 +154,55 @@ class TileMap:
         - tileset_info: Información del tileset (ruta, tamaño, columnas, filas)
         
         Retorna:
-        - Superficie de pygame con el tileset cargado
+        - Superficie de pygame con el tileset cargado (compartida entre reglas y mapas)
         """
         try:
-            tileset = pygame.image.load(tileset_info.path).convert_alpha()
+            tileset = AssetManager.load_image(tileset_info.path)
             return tileset
         except Exception as e:
             print(f"Error cargando tileset: {e}")
             raise
 
-    def _get_tile_from_tileset(self, tileset: pygame.Surface, tile_id: int, tileset_info: TilesetInfo) -> pygame.Surface:
+    def _rule_tiles(self, rule: GenerationRule):
         """
-        Extrae un tile individual del tileset.
+        Obtiene los tiles que puede colocar una regla aleatoria.
         
         Parámetros:
-        - tileset: Superficie con el tileset completo
-        - tile_id: ID del tile a extraer
-        - tileset_info: Información del tileset
+        - rule: Regla de generación aleatoria
         
         Retorna:
-        - Superficie con el tile individual
+        - Tupla (IDs de tile en el tileset, pesos): los de la lista de la regla,
+          o todos los tiles del tileset con el mismo peso si no hay lista
         """
-        tile_x = (tile_id % tileset_info.columns) * tileset_info.tile_size
-        tile_y = (tile_id // tileset_info.columns) * tileset_info.tile_size
-        
-        tile_surface = pygame.Surface(
-            (tileset_info.tile_size, tileset_info.tile_size),
-            pygame.SRCALPHA
-        )
-        tile_surface.blit(
-            tileset, 
-            (0, 0),
-            (tile_x, tile_y, tileset_info.tile_size, tileset_info.tile_size)
-        )
-        return tile_surface
-    
-    def _scale_tile(self, tile_surface: pygame.Surface) -> pygame.Surface:
-        """
-        Escala un tile según el zoom actual.
-        
-        Parámetros:
-        - tile_surface: Superficie del tile original
-        
-        Retorna:
-        - Tile escalado desde caché o nuevo
-        """
-        if tile_surface not in self.scaled_tile_cache:
-            scaled_tile_surface = pygame.transform.scale(tile_surface, (int(16 * self.settings.zoom), int(16 * self.settings.zoom)))
-            self.scaled_tile_cache[tile_surface] = scaled_tile_surface
-        return self.scaled_tile_cache[tile_surface]
+        if rule.tiles:
+            return [tile["tile"] for tile in rule.tiles], [tile["weight"] for tile in rule.tiles]
+        tile_ids = list(range(rule.tileset.columns * rule.tileset.rows))
+        return tile_ids, [1] * len(tile_ids)
 
-    def _choose_tile(self, rule: GenerationRule) -> int:
+    def _compile_random_rule(self, rule: GenerationRule, tileset: pygame.Surface) -> AliasTable:
         """
-        Selecciona un tile aleatorio según las reglas de generación.
+        Prepara una regla aleatoria para muestrearla de forma vectorizada.
         
         Parámetros:
         - rule: Regla de generación que contiene la configuración de tiles
+        - tileset: Superficie con el tileset de la regla
         
         Retorna:
-        - ID del tile seleccionado basado en:
+        - Tabla de alias sobre los IDs del atlas de los tiles de la regla:
         * Lista de tiles y sus pesos si están definidos
-        * Tile aleatorio del tileset si no hay lista específica
+        * Todos los tiles del tileset con el mismo peso si no hay lista específica
         """
-        if rule.tiles:
-            tiles = [tile["tile"] for tile in rule.tiles]
-            weights = [tile["weight"] for tile in rule.tiles]
-            return random.choices(tiles, weights=weights, k=1)[0]
-        else:
-            return random.randint(0, rule.tileset.columns * rule.tileset.rows - 1)
+        tile_ids, weights = self._rule_tiles(rule)
+        gids = np.array([self.atlas.intern(tileset, rule.tileset, tile_id) for tile_id in tile_ids], dtype=np.uint16)
+        return AliasTable(gids, weights)
+
+    def _build_safe_mask(self):
+        """
+        Precalcula las celdas dentro del radio seguro alrededor del jugador.
+        """
+        player_x, player_y = self.player_start_pos
+        ys, xs = np.ogrid[0:self.settings.map_height, 0:self.settings.map_width]
+        self.safe_mask = (xs - player_x) ** 2 + (ys - player_y) ** 2 < self.safe_radius ** 2
 
     def _is_within_safe_radius(self, x, y):
         """
@@ -191,71 +214,611 @@ class TileMap:
         
         Retorna:
         - True si la posición está dentro del radio seguro
-        - False si está fuera
+        - False si está fuera (incluidas las posiciones fuera del mapa)
         
-        Calcula la distancia euclidiana desde la posición inicial del jugador
+        Las coordenadas son locales a la ventana; la máscara se calcula con la
+        ventana inicial, que es la que contiene al jugador al empezar.
         """
-        player_x, player_y = self.player_start_pos
-        distance = ((x - player_x) ** 2 + (y - player_y) ** 2) ** 0.5
-        return distance < self.safe_radius
+        x += self.origin_x
+        y += self.origin_y
+        if 0 <= x < self.settings.map_width and 0 <= y < self.settings.map_height:
+            return bool(self.safe_mask[y, x])
+        return False
+
+    def _apply_random_rule(self, rule: GenerationRule, tileset: pygame.Surface, layer: np.ndarray):
+        """
+        Aplica una regla aleatoria a todo el mapa en una sola pasada vectorizada.
+        
+        Parámetros:
+        - rule: Regla de generación aleatoria
+        - tileset: Superficie con el tileset de la regla
+        - layer: Rejilla de IDs del atlas donde escribir los tiles
+        
+        Proceso:
+        1. Máscara de celdas que superan la probabilidad de la regla
+        2. Excluye el radio seguro si la regla es colisionable
+        3. Elige el tile de cada celda con la tabla de alias
+        """
+        mask = self.rng.random(layer.shape) < rule.chance
+        if rule.collidable:
+            mask &= ~self.safe_mask
+        table = self._compile_random_rule(rule, tileset)
+        layer[mask] = table.sample(self.rng, int(mask.sum()))
+        if rule.collidable:
+            ys, xs = np.nonzero(mask)
+            self.collidables.update(zip(xs.tolist(), ys.tolist()))
 
     def generate(self):
         """
         Genera el mapa completo aplicando las reglas de generación.
         
         Proceso:
-        1. Inicializa semilla aleatoria
-        2. Aplica reglas por etapas
-        3. Genera capa base
-        4. Coloca patrones
-        5. Crea caché de la capa base
+        1. Carga los tilesets e interna sus tiles y prefabs (prepare_assets)
+        2. Genera las capas, los patrones y las estructuras de consulta (generate_data)
+        3. Crea las superficies del overlay y del minimapa (build_surfaces)
+        
+        MapPreloader hace el paso 2 en un hilo de trabajo y los pasos 1 y 3
+        en el hilo principal.
         """
-        try:
-            print("Generando TileMap...")
-            random.seed(self.seed)
+        self.prepare_assets()
+        self.generate_data()
+        self.build_surfaces()
 
+    def prepare_assets(self):
+        """
+        Carga los tilesets de todas las reglas e interna sus tiles y prefabs.
+        
+        Todo lo que crea superficies o registra recursos compartidos del proceso
+        (AssetManager, TileAtlas y los prefabs de Pattern) pasa aquí, en el hilo
+        principal. Después generate_data solo encuentra los tiles y prefabs ya
+        registrados; lo único que crea son las variantes de prefab sin celdas
+        colisionables, que no tienen superficies.
+        """
+        try:
             for stage in self.stages:
                 for rule in stage.rules:
                     if not rule.tileset:
-                        print(f"Error: La regla de generación no tiene un tileset definido: {rule}")
                         continue
-
                     tileset = self._load_tileset(rule.tileset)
                     if rule.type == "random":
-                        for y in range(self.settings.map_height):
-                            for x in range(self.settings.map_width):
-                                if random.random() < rule.chance and not (rule.collidable and self._is_within_safe_radius(x, y)):
-                                    tile_id = self._choose_tile(rule)
-                                    tile_surface = self._get_tile_from_tileset(tileset, tile_id, rule.tileset)
-                                    scaled_tile_surface = self._scale_tile(tile_surface)
-                                    if stage.name == "base":
-                                        self.base_layer[y][x] = scaled_tile_surface
-                                    else:
-                                        self.medium_layer.append(Tile(scaled_tile_surface, x, y, 1, rule.collidable, False))
-                                    if rule.collidable:
-                                        self.collidables.add((x, y))
-                    elif rule.type == "pattern":
-                        if rule.position:
-                            self._place_pattern(rule, tileset, rule.position[0], rule.position[1])
-                            self.generated_patterns.append((rule, rule.position))
-                        elif rule.chance:
-                            self._place_random_pattern(rule, tileset)
+                        tile_ids, _ = self._rule_tiles(rule)
+                        for tile_id in tile_ids:
+                            self.atlas.intern(tileset, rule.tileset, tile_id)
+                    elif rule.type == "pattern" and rule.pattern:
+                        Pattern.shared(self.atlas, tileset, rule.tileset, rule.pattern)
+        except Exception as e:
+            print(f"Error preparando los recursos de TileMap: {e}")
+            raise
+
+    def generate_data(self):
+        """
+        Genera las capas del mapa y sus estructuras de consulta.
+        
+        Proceso:
+        1. Inicializa el generador de NumPy con la semilla y la máscara del radio seguro
+        2. Aplica reglas por etapas (las aleatorias, vectorizadas sobre todo el mapa)
+        3. Genera capa base
+        4. Coloca patrones
+        5. Indexa decoraciones y patrones por filas para consultas por rango visible
+        6. Construye la rejilla de colisiones y el buscador de caminos jerárquico
+        
+        Con world_streaming el mapa es una ventana de chunks del mundo infinito
+        centrada en el jugador (ver update_stream). Si no, las etapas solo se
+        aplican cuando el mapa de esta semilla no está en la caché de disco.
+        
+        Solo trabaja con arrays de NumPy, así que puede ejecutarse fuera del
+        hilo principal después de prepare_assets.
+        """
+        try:
+            print("Generando TileMap...")
+            self.rng = np.random.default_rng(self.seed)
+            self._build_safe_mask()
+            self.occupancy = self.safe_mask.copy()
+
+            cached = None  # Rejilla de colisiones y entradas del buscador guardadas en la caché de disco
+            if self.settings.world_streaming:
+                self._start_streaming()
+                self._assemble_window(0, 0)
+            else:
+                cached = self._load_from_cache()
+                if cached is None:
+                    self._apply_stages()
             print("TileMap generado correctamente")
             self._log_generated_patterns()
 
-            # Crear la superficie de caché para la capa base
-            self.base_layer_surface = pygame.Surface(
-                (self.settings.map_width * self.settings.tile_size, self.settings.map_height * self.settings.tile_size),
-                pygame.SRCALPHA
-            )
-            for y in range(self.settings.map_height):
-                for x in range(self.settings.map_width):
-                    if self.base_layer[y][x] is not None:
-                        self.base_layer_surface.blit(self.base_layer[y][x], (x * self.settings.tile_size, y * self.settings.tile_size))
+            # Los chunks pre-renderizados de un mapa anterior dejan de ser válidos
+            self.chunk_cache.clear()
+            self.chunk_cache_bytes = 0
+            self.background_buffer_camera = None
+
+            if cached is None:
+                self._build_queries()
+                if not self.settings.world_streaming:
+                    self._save_to_cache()
+            else:
+                self._build_queries(*cached)
+            self.pathfinder.prepare(self.player_start_pos)
         except Exception as e:
             print(f"Error generando TileMap: {e}")
             raise
 
+    def build_surfaces(self):
+        """
+        Crea las superficies que dependen del mapa generado (hilo principal).
+        
+        Incluye las superficies del overlay de cada patrón y el terreno del
+        minimapa. Se repite cada vez que la ventana del mundo infinito se recentra.
+        """
+        # Precalcular las variantes translúcidas de la capa overlay
+        self._build_overlay_surfaces()
+
+        # Terreno del minimapa (se dibuja una sola vez por mapa o ventana)
+        self._build_minimap_surface()
+
+    def _apply_stages(self):
+        """
+        Aplica las reglas de generación por etapas sobre el mapa fijo completo.
+        """
+        for stage in self.stages:
+            for rule in stage.rules:
+                if not rule.tileset:
+                    print(f"Error: La regla de generación no tiene un tileset definido: {rule}")
+                    continue
+
+                tileset = self._load_tileset(rule.tileset)
+                if rule.type == "random":
+                    if stage.name == "base":
+                        layer = self.base_layer
+                    else:
+                        layer = np.zeros((self.settings.map_height, self.settings.map_width), dtype=np.uint16)
+                        self.decoration_layers.append(layer)
+                    self._apply_random_rule(rule, tileset, layer)
+                elif rule.type == "pattern":
+                    if rule.position:
+                        self._place_pattern(rule, tileset, rule.position[0], rule.position[1])
+                        self.generated_patterns.append((rule, rule.position))
+                    elif rule.chance:
+                        self._place_random_pattern(rule, tileset)
+
+    def _save_to_cache(self):
+        """
+        Guarda en la caché de disco el mapa generado y sus estructuras de consulta.
+        
+        Además de capas y colisiones guarda las instancias de patrón (índice
+        de prefab y posición), la rejilla de colisiones y las entradas del
+        buscador de caminos, para que cargar no tenga que recalcularlas.
+        """
+        if self.map_cache is None:
+            return
+        rules = [rule for stage in self.stages for rule in stage.rules]
+        rule_indexes = {id(rule): index for index, rule in enumerate(rules)}
+        layers = [self.base_layer] + self.decoration_layers
+        used = set(np.unique(np.stack(layers)).tolist())
+        tiles = {gid: key for key, gid in self.atlas.ids.items() if gid in used}
+        patterns = [(rule_indexes[id(rule)], x, y) for rule, (x, y) in self.generated_patterns]
+
+        # Cada prefab distinto (incluidas las variantes de la zona segura) se guarda una vez
+        prefab_indexes = {}
+        prefabs = []
+        instances = []
+        for instance in self.pattern_instances:
+            prefab = instance.prefab
+            index = prefab_indexes.get(id(prefab))
+            if index is None:
+                index = prefab_indexes[id(prefab)] = len(prefabs)
+                info = prefab.tileset_info
+                prefabs.append(((info.path, info.tile_size, info.columns), prefab.shape))
+            instances.append((index, instance.x, instance.y))
+
+        self.map_cache.save(self.seed, layers, self.collidables, patterns, tiles, prefabs, instances,
+                            self.collision_grid, self.pathfinder.entrance_pairs)
+
+    def _load_from_cache(self):
+        """
+        Carga el mapa de esta semilla desde la caché de disco.
+        
+        Retorna:
+        - Tupla (rejilla de colisiones, entradas del buscador de caminos) para
+          _build_queries si estaba en caché (las entradas pueden ser None)
+        - None si hay que generarlo
+        
+        Traduce los IDs guardados a los del atlas de este proceso y crea las
+        instancias de patrón directamente a partir de sus prefabs, sin aplicar
+        ninguna regla ni volver a colocar los patrones.
+        """
+        if self.map_cache is None:
+            return None
+        cached = self.map_cache.load(self.seed)
+        if cached is None:
+            return None
+
+        rules = [rule for stage in self.stages for rule in stage.rules]
+        tilesets = {(rule.tileset.path, rule.tileset.tile_size, rule.tileset.columns): rule.tileset for rule in rules}
+        remap = np.zeros(max(cached["tiles"], default=0) + 1, dtype=np.uint16)
+        for gid, (path, tile_size, columns, tile_id) in cached["tiles"].items():
+            tileset_info = tilesets[(path, tile_size, columns)]
+            remap[gid] = self.atlas.intern(self._load_tileset(tileset_info), tileset_info, tile_id)
+        layers = cached["layers"]
+        self.base_layer = remap[layers[0]]
+        self.decoration_layers = [remap[layer] for layer in layers[1:]]
+
+        self.collidables.update(map(tuple, cached["collidables"].tolist()))
+        prefabs = []
+        for tileset_key, shape in cached["prefabs"]:
+            tileset_info = tilesets[tileset_key]
+            prefabs.append(Pattern.shared(self.atlas, self._load_tileset(tileset_info), tileset_info, shape))
+        self.pattern_instances = [PatternInstance(prefabs[index], x, y, y + prefabs[index].height - 1)
+                                  for index, x, y in cached["instances"].tolist()]
+        self.generated_patterns = [(rules[index], (x, y)) for index, x, y in cached["patterns"].tolist()]
+        print("Mapa cargado de la caché de disco")
+        # Copias en memoria: la rejilla y las entradas viven más que la proyección del archivo
+        entrances = cached["entrances"]
+        return np.array(cached["collision_grid"]), None if entrances is None else np.array(entrances)
+
+    def _build_queries(self, collision_grid=None, entrances=None):
+        """
+        Construye las estructuras de consulta del mapa a partir de sus capas.
+        
+        Parámetros:
+        - collision_grid: Rejilla de colisiones ya calculada (de la caché de disco)
+        - entrances: Pares de tiles de las entradas del buscador ya calculados
+        
+        Incluye el índice de patrones, la rejilla de colisiones y el buscador
+        de caminos; las superficies se crean aparte en build_surfaces. Se
+        repite cada vez que la ventana del mundo infinito se recentra.
+        """
+        # Indexar los patrones por filas, ya ordenados por profundidad
+        self._build_tile_indexes()
+
+        # Rejilla de colisiones para consultas vectorizadas
+        self._build_collision_grid(collision_grid)
+
+        # Construir el grafo de clusters para la búsqueda de caminos
+        self.pathfinder = HierarchicalPathfinder(
+            self,
+            self.settings.pathfinding_cluster_size,
+            self.settings.pathfinding_search_radius,
+            previous=self.pathfinder,
+            entrances=entrances
+        )
+
+    def _start_streaming(self):
+        """
+        Prepara la generación por chunks del mundo infinito.
+        
+        Compila las reglas para los procesos de trabajo e interna en el atlas
+        todos los tiles posibles de cada regla aleatoria, de forma que los
+        chunks generados fuera solo contienen IDs de tileset.
+        """
+        self.stream_rules = [rule for stage in self.stages for rule in stage.rules]
+        self.compiled_rules = compile_rules(self.stages)
+        self.rule_gids = {}
+        for rule, compiled_rule in zip(self.stream_rules, self.compiled_rules):
+            if rule.type == "random":
+                tileset = self._load_tileset(rule.tileset)
+                tile_ids = compiled_rule["tile_ids"]
+                table = np.zeros(max(tile_ids) + 2, dtype=np.uint16)
+                for tile_id in tile_ids:
+                    table[tile_id + 1] = self.atlas.intern(tileset, rule.tileset, tile_id)
+                self.rule_gids[compiled_rule["index"]] = table
+        # Los patrones crecen hacia la derecha y hacia abajo desde su origen
+        extent = max((max(rule["width"], rule["height"]) for rule in self.compiled_rules if "width" in rule), default=1)
+        self.pattern_margin = -(-(extent - 1) // self.chunk_size)
+        self.chunk_stream = ChunkStream(self.settings, self.seed, self.compiled_rules,
+                                        self.player_start_pos, self.safe_radius)
+
+    def _window_keys(self, origin_chunk_x, origin_chunk_y):
+        """
+        Obtiene los chunks que forman una ventana.
+        
+        Parámetros:
+        - origin_chunk_x, origin_chunk_y: Chunk de la esquina superior izquierda
+        
+        Retorna:
+        - Lista de coordenadas (chunk_x, chunk_y)
+        """
+        size = self.settings.stream_window_chunks
+        return [(origin_chunk_x + cx, origin_chunk_y + cy) for cy in range(size) for cx in range(size)]
+
+    def _margin_keys(self, origin_chunk_x, origin_chunk_y):
+        """
+        Obtiene los chunks del margen de una ventana cuyos patrones pueden entrar en ella.
+        
+        Parámetros:
+        - origin_chunk_x, origin_chunk_y: Chunk de la esquina superior izquierda
+        
+        Retorna:
+        - Lista de coordenadas (chunk_x, chunk_y) de las pattern_margin filas
+          de encima y columnas de la izquierda (esquina incluida)
+        
+        Un patrón anclado en uno de estos chunks puede sobresalir dentro de la
+        ventana; los anclados a la derecha o debajo no llegan a entrar.
+        """
+        margin = self.pattern_margin
+        size = self.settings.stream_window_chunks
+        return [(origin_chunk_x + cx, origin_chunk_y + cy)
+                for cy in range(-margin, size) for cx in range(-margin, size)
+                if cx < 0 or cy < 0]
+
+    def _assemble_window(self, origin_chunk_x, origin_chunk_y):
+        """
+        Rellena las capas del mapa con los chunks de una ventana del mundo infinito.
+        
+        Parámetros:
+        - origin_chunk_x, origin_chunk_y: Chunk de la esquina superior izquierda
+        
+        Las capas y los tiles de patrones se guardan en coordenadas locales de la
+        ventana (origin_x y origin_y traducen entre ellas y las del mundo); los
+        tiles colisionables, en coordenadas del mundo.
+        """
+        self.origin_x = origin_chunk_x * self.chunk_size
+        self.origin_y = origin_chunk_y * self.chunk_size
+        shape = (self.settings.map_height, self.settings.map_width)
+        self.base_layer = np.zeros(shape, dtype=np.uint16)
+        self.decoration_layers = [np.zeros(shape, dtype=np.uint16)
+                                  for index in self.rule_gids if not self.compiled_rules[index]["base"]]
+        self._map_stream_layers()
+        self.placed_chunks = {}
+
+        keys = self._window_keys(origin_chunk_x, origin_chunk_y)
+        margin_keys = self._margin_keys(origin_chunk_x, origin_chunk_y)
+        for key in keys:
+            self._place_chunk(key)
+            self._copy_chunk_layers(key)
+        for key in margin_keys:
+            self._place_chunk(key)
+        self._collect_window(keys, margin_keys)
+
+    def _shift_window(self, origin_chunk_x, origin_chunk_y):
+        """
+        Recentra la ventana del mundo infinito cargando solo los chunks nuevos.
+        
+        Parámetros:
+        - origin_chunk_x, origin_chunk_y: Chunk de la nueva esquina superior izquierda
+        
+        Retorna:
+        - Lista de chunks que no estaban en la ventana anterior
+        
+        Desplaza la parte común de las capas a su nueva posición local, descarta
+        los chunks que salen y mueve las instancias de patrón de los que se
+        quedan. El resultado es el mismo que el de _assemble_window.
+        """
+        height, width = self.base_layer.shape
+        dx = origin_chunk_x * self.chunk_size - self.origin_x
+        dy = origin_chunk_y * self.chunk_size - self.origin_y
+        keys = self._window_keys(origin_chunk_x, origin_chunk_y)
+        margin_keys = self._margin_keys(origin_chunk_x, origin_chunk_y)
+        if abs(dx) >= width or abs(dy) >= height:
+            self._assemble_window(origin_chunk_x, origin_chunk_y)
+            return keys
+
+        source = np.s_[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)]
+        target = np.s_[max(-dy, 0):height + min(-dy, 0), max(-dx, 0):width + min(-dx, 0)]
+        layers = []
+        for layer in [self.base_layer] + self.decoration_layers:
+            shifted = np.zeros_like(layer)
+            shifted[target] = layer[source]
+            layers.append(shifted)
+        self.base_layer = layers[0]
+        self.decoration_layers = layers[1:]
+        self._map_stream_layers()
+        self.origin_x += dx
+        self.origin_y += dy
+
+        kept = set(keys).union(margin_keys, self.prefetch_keys)
+        for key in [key for key in self.placed_chunks if key not in kept]:
+            del self.placed_chunks[key]
+        for _, instances, _ in self.placed_chunks.values():
+            for instance in instances:
+                instance.x -= dx
+                instance.y -= dy
+                instance.depth -= dy
+
+        for key in keys + margin_keys:
+            if key not in self.placed_chunks:
+                self._place_chunk(key)
+        new_keys = [key for key in keys if not self._in_window(key, dx, dy)]
+        for key in new_keys:
+            self._copy_chunk_layers(key)
+        self._collect_window(keys, margin_keys)
+        return new_keys
+
+    def _in_window(self, key, dx, dy):
+        """
+        Verifica si un chunk estaba en la ventana antes de desplazarla.
+        
+        Parámetros:
+        - key: Coordenadas (chunk_x, chunk_y)
+        - dx, dy: Desplazamiento en tiles que se acaba de aplicar al origen
+        
+        Retorna:
+        - True si el chunk estaba entero dentro de la ventana anterior
+        """
+        local_x = key[0] * self.chunk_size - self.origin_x + dx
+        local_y = key[1] * self.chunk_size - self.origin_y + dy
+        return 0 <= local_x < self.settings.map_width and 0 <= local_y < self.settings.map_height
+
+    def _map_stream_layers(self):
+        """
+        Asocia cada regla aleatoria compilada con la capa de la ventana que rellena.
+        """
+        decorations = iter(self.decoration_layers)
+        self.stream_layers = {index: self.base_layer if self.compiled_rules[index]["base"] else next(decorations)
+                              for index in self.rule_gids}
+
+    def _place_chunk(self, key):
+        """
+        Coloca los patrones de un chunk del mundo infinito.
+        
+        Parámetros:
+        - key: Coordenadas (chunk_x, chunk_y)
+        
+        Guarda en placed_chunks sus tiles colisionables (en coordenadas del
+        mundo, incluidos los de sus patrones), sus instancias de patrón (en
+        coordenadas locales de la ventana actual) y sus patrones generados,
+        para poder descartarlo o desplazarlo al recentrar sin colocarlo de nuevo.
+        """
+        _, collision, patterns = self.chunk_stream.get(key)
+        world_x = key[0] * self.chunk_size
+        world_y = key[1] * self.chunk_size
+        ys, xs = np.nonzero(collision)
+        tiles = set(zip((xs + world_x).tolist(), (ys + world_y).tolist()))
+        instances = []
+        generated = []
+        for index, pos_x, pos_y in patterns:
+            rule = self.stream_rules[index]
+            instance = self._pattern_instance(rule, self._load_tileset(rule.tileset), pos_x - self.origin_x, pos_y - self.origin_y)
+            if instance is not None:
+                instances.append(instance)
+                rows, cols = np.nonzero(instance.prefab.collision_mask)
+                tiles.update(zip((cols + pos_x).tolist(), (rows + pos_y).tolist()))
+            generated.append((rule, (pos_x, pos_y)))
+        self.placed_chunks[key] = (tiles, instances, generated)
+
+    def _copy_chunk_layers(self, key):
+        """
+        Copia las capas de un chunk en su posición de la ventana.
+        
+        Parámetros:
+        - key: Coordenadas (chunk_x, chunk_y) de un chunk de la ventana
+        """
+        chunk_layers, _, _ = self.chunk_stream.get(key)
+        local_x = key[0] * self.chunk_size - self.origin_x
+        local_y = key[1] * self.chunk_size - self.origin_y
+        window = np.s_[local_y:local_y + self.chunk_size, local_x:local_x + self.chunk_size]
+        for index, tile_ids in chunk_layers:
+            np.copyto(self.stream_layers[index][window], self.rule_gids[index][tile_ids], where=tile_ids > 0)
+
+    def _place_prefetched_chunks(self, budget_ms):
+        """
+        Coloca de antemano los patrones de los chunks encargados que ya están generados.
+        
+        Parámetros:
+        - budget_ms: Tiempo máximo en milisegundos para este frame
+        
+        Así, al recentrar, los chunks que entran en la ventana solo tienen que
+        copiar sus capas.
+        """
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        for key in self.prefetch_keys:
+            if key in self.placed_chunks or key not in self.chunk_stream.cache:
+                continue
+            self._place_chunk(key)
+            if time.perf_counter() >= deadline:
+                return
+
+    def _collect_window(self, keys, margin_keys):
+        """
+        Reúne los tiles colisionables y los patrones de los chunks de la ventana.
+        
+        Parámetros:
+        - keys: Chunks de la ventana en orden (el mismo orden de patrones que al ensamblarla)
+        - margin_keys: Chunks del margen (ver _margin_keys), también en orden
+        
+        De los chunks del margen solo se toman los patrones que entran en la
+        ventana, con sus tiles colisionables recortados a ella. Así un patrón
+        que cruza el borde de la ventana existe sea cual sea su centro.
+        """
+        chunks = [self.placed_chunks[key] for key in keys]
+        self.collidables = set().union(*(tiles for tiles, _, _ in chunks))
+        self.pattern_instances = [instance for _, instances, _ in chunks for instance in instances]
+        self.generated_patterns = [pattern for _, _, generated in chunks for pattern in generated]
+
+        width = self.settings.map_width
+        height = self.settings.map_height
+        for key in margin_keys:
+            for instance in self.placed_chunks[key][1]:
+                prefab = instance.prefab
+                if instance.x + prefab.width <= 0 or instance.y + prefab.height <= 0:
+                    continue
+                self.pattern_instances.append(instance)
+                rows, cols = np.nonzero(prefab.collision_mask)
+                xs = cols + instance.x
+                ys = rows + instance.y
+                inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+                self.collidables.update(zip((xs[inside] + self.origin_x).tolist(), (ys[inside] + self.origin_y).tolist()))
+
+    def update_stream(self, player_x, player_y, velocity):
+        """
+        Mantiene la ventana del mundo infinito alrededor del jugador.
+        
+        Parámetros:
+        - player_x, player_y: Posición del jugador en píxeles del mundo
+        - velocity: Dirección de movimiento del jugador (Vector2)
+        
+        Proceso:
+        1. Recentra la ventana si el jugador se aleja de su centro
+        2. Encarga a los procesos de trabajo la ventana hacia la que se dirige
+        3. Recoge los chunks terminados y descarta los lejanos si se supera la memoria
+        4. Coloca con un presupuesto de tiempo los patrones de los chunks encargados
+        
+        No hace nada en mapas fijos.
+        """
+        if self.chunk_stream is None:
+            return
+        chunk_pixels = self.chunk_size * self.settings.tile_size
+        half = self.settings.stream_window_chunks // 2
+        player_chunk_x = int(player_x // chunk_pixels)
+        player_chunk_y = int(player_y // chunk_pixels)
+        origin_chunk_x = self.origin_x // self.chunk_size
+        origin_chunk_y = self.origin_y // self.chunk_size
+
+        if (abs(player_chunk_x - (origin_chunk_x + half)) >= self.settings.stream_recenter_chunks or
+                abs(player_chunk_y - (origin_chunk_y + half)) >= self.settings.stream_recenter_chunks):
+            origin_chunk_x = player_chunk_x - half
+            origin_chunk_y = player_chunk_y - half
+            self._shift_window(origin_chunk_x, origin_chunk_y)
+            self._build_queries()
+            self.build_surfaces()
+            # Expandir poco a poco los clusters nuevos que rodean al jugador
+            tile_size = self.settings.tile_size
+            self.pathfinder.prepare((int(player_x // tile_size), int(player_y // tile_size)))
+
+        if velocity.length_squared() > 0:
+            ahead = velocity.normalize() * self.settings.stream_prefetch_chunks
+            prefetch_keys = self._window_keys(
+                player_chunk_x + round(ahead.x) - half,
+                player_chunk_y + round(ahead.y) - half
+            )
+            prefetch_keys += self._margin_keys(player_chunk_x + round(ahead.x) - half,
+                                               player_chunk_y + round(ahead.y) - half)
+            self.chunk_stream.request(prefetch_keys)
+            self.prefetch_keys = prefetch_keys
+        self.chunk_stream.collect()
+        self.chunk_stream.evict(set(self._window_keys(origin_chunk_x, origin_chunk_y) +
+                                    self._margin_keys(origin_chunk_x, origin_chunk_y)))
+        self._place_prefetched_chunks(self.settings.stream_place_ms)
+
+    def pixel_bounds(self):
+        """
+        Obtiene los límites del área jugable en píxeles del mundo.
+        
+        Retorna:
+        - Tupla (izquierda, arriba, derecha, abajo): el mapa completo en mapas
+          fijos o la ventana cargada en el mundo infinito
+        """
+        tile_size = self.settings.tile_size
+        left = self.origin_x * tile_size
+        top = self.origin_y * tile_size
+        return (left, top,
+                left + self.settings.map_width * tile_size,
+                top + self.settings.map_height * tile_size)
+
+    def get_view_rect(self, margin=0):
+        """
+        Obtiene el rectángulo visible de la cámara en píxeles del mundo.
+        
+        Parámetros:
+        - margin: Píxeles que se amplía por cada lado
+        
+        Retorna:
+        - pygame.Rect con la zona visible al zoom actual
+        """
+        zoom = self.settings.zoom
+        view = pygame.Rect(int(self.camera_x // 1), int(self.camera_y // 1),
+                           int(self.settings.screen_width / zoom) + 1, int(self.settings.screen_height / zoom) + 1)
+        return view.inflate(2 * margin, 2 * margin)
+
     def _place_pattern(self, rule, tileset, pos_x, pos_y):
         """
         Coloca un patrón en una posición específica.
@@ -265,34 +828,55 @@ class TileMap:
         - tileset: Tileset a usar
         - pos_x, pos_y: Posición donde colocar
         
-        Gestiona colisiones y escalado
+        Añade la instancia a los patrones colocados, sus celdas colisionables
+        a collidables y su huella a la rejilla de ocupación.
+        """
+        instance = self._pattern_instance(rule, tileset, pos_x, pos_y)
+        if instance is None:
+            return
+        prefab = instance.prefab
+        self.pattern_instances.append(instance)
+        rows, cols = np.nonzero(prefab.collision_mask)
+        self.collidables.update(zip((cols + pos_x + self.origin_x).tolist(), (rows + pos_y + self.origin_y).tolist()))
+
+        # Marcar la huella en la rejilla de ocupación (solo la parte dentro del mapa)
+        rows, cols = np.nonzero(prefab.footprint)
+        ys = rows + pos_y
+        xs = cols + pos_x
+        inside = (xs >= 0) & (xs < self.settings.map_width) & (ys >= 0) & (ys < self.settings.map_height)
+        self.occupancy[ys[inside], xs[inside]] = True
+
+    def _pattern_instance(self, rule, tileset, pos_x, pos_y):
+        """
+        Crea la instancia de un patrón en una posición sin añadirla al mapa.
+        
+        Parámetros:
+        - rule: Regla de generación
+        - tileset: Tileset a usar
+        - pos_x, pos_y: Posición local de la ventana
+        
+        Retorna:
+        - La instancia, o None si no queda ninguna celda que colocar
+        
+        Usa el prefab compartido del patrón: una sola superficie y una sola
+        entrada de dibujo por instancia. Si alguna celda colisionable cae en
+        la zona segura se compone una variante del prefab sin esas celdas.
         """
         if not rule.pattern:
             print(f"Error: La regla de generación de patrón no tiene un patrón definido: {rule}")
-            return
+            return None
 
-        pattern_height = len(rule.pattern)
-        pattern_width = len(rule.pattern[0])
-        for py in range(pattern_height):
-            for px in range(pattern_width):
-                cell = rule.pattern[py][px]
-                if isinstance(cell, dict):
-                    tile_id = cell["tile"]
-                    collidable = cell["collidable"]
-                    x = pos_x + px
-                    y = pos_y + py
-                    if not (collidable and self._is_within_safe_radius(x, y)):
-                        tile_surface = self._get_tile_from_tileset(tileset, tile_id, rule.tileset)
-                        scaled_tile_surface = pygame.transform.scale(tile_surface, (int(16 * self.settings.zoom), int(16 * self.settings.zoom)))
-                        self.pattern_tiles.append(Tile(scaled_tile_surface, x, y, 1, collidable, True))
-                        if collidable:
-                            self.collidables.add((x, y))
-                elif cell != 0:
-                    x = pos_x + px
-                    y = pos_y + py
-                    tile_surface = self._get_tile_from_tileset(tileset, cell, rule.tileset)
-                    scaled_tile_surface = pygame.transform.scale(tile_surface, (int(16 * self.settings.zoom), int(16 * self.settings.zoom)))
-                    self.pattern_tiles.append(Tile(scaled_tile_surface, x, y, 1, False, True))
+        prefab = Pattern.shared(self.atlas, tileset, rule.tileset, rule.pattern)
+        rows, cols = np.nonzero(prefab.collision_mask)
+        unsafe = np.array([self._is_within_safe_radius(pos_x + col, pos_y + row)
+                           for row, col in zip(rows.tolist(), cols.tolist())], dtype=bool)
+        if unsafe.any():
+            removed = np.zeros_like(prefab.collision_mask)
+            removed[rows[unsafe], cols[unsafe]] = True
+            prefab = Pattern.shared(self.atlas, tileset, rule.tileset, prefab.without(removed))
+            if not prefab.cells:
+                return None
+        return PatternInstance(prefab, pos_x, pos_y, pos_y + prefab.height - 1)
 
     def _place_random_pattern(self, rule, tileset):
         """
@@ -304,25 +888,65 @@ class TileMap:
         
         Proceso:
         1. Calcula número de patrones basado en el tamaño del mapa y probabilidad
-        2. Para cada patrón:
-        - Elige posición aleatoria
-        - Verifica que no interfiera con zona segura
-        - Coloca el patrón si es seguro
-        - Registra el patrón generado
+        2. Elige todas las posiciones candidatas de una vez
+        3. Descarta en bloque las cuya huella (celdas no vacías del patrón) pisa
+           la rejilla de ocupación, que incluye la zona segura
+        4. Acepta por orden las restantes, rechazando las que se solapan con
+           otra aceptada en esta misma pasada, y las añade todas de una vez
+        
+        Ningún tile de patrón queda encima de otro.
         """
 
         if not rule.pattern:
             print(f"Error: La regla de generación de patrón aleatorio no tiene un patrón definido: {rule}")
             return
 
-        pattern_height = len(rule.pattern)
-        pattern_width = len(rule.pattern[0])
-        for _ in range(int(self.settings.map_width * self.settings.map_height * rule.chance)):
-            pos_x = random.randint(0, self.settings.map_width - pattern_width)
-            pos_y = random.randint(0, self.settings.map_height - pattern_height)
-            if not any(self._is_within_safe_radius(pos_x + px, pos_y + py) for py in range(pattern_height) for px in range(pattern_width)):
-                self._place_pattern(rule, tileset, pos_x, pos_y)
-                self.generated_patterns.append((rule, (pos_x, pos_y)))
+        prefab = Pattern.shared(self.atlas, tileset, rule.tileset, rule.pattern)
+        footprint_y, footprint_x = np.nonzero(prefab.footprint)
+        count = int(self.settings.map_width * self.settings.map_height * rule.chance)
+        pos_xs = self.rng.integers(0, self.settings.map_width - prefab.width + 1, count)
+        pos_ys = self.rng.integers(0, self.settings.map_height - prefab.height + 1, count)
+
+        # Prueba vectorizada de "cabe la huella" contra la ocupación actual
+        fits = ~self.occupancy[pos_ys[:, None] + footprint_y, pos_xs[:, None] + footprint_x].any(axis=1)
+
+        # Los candidatos de esta pasada pueden solaparse entre sí: se resuelven en
+        # orden sobre la rejilla aplanada (una vista, así que marca self.occupancy)
+        width = self.settings.map_width
+        offsets = footprint_y * width + footprint_x
+        occupancy = self.occupancy.reshape(-1)
+        positions = []
+        for pos_x, pos_y in zip(pos_xs[fits].tolist(), pos_ys[fits].tolist()):
+            cells = offsets + (pos_y * width + pos_x)
+            if occupancy[cells].any():
+                continue
+            occupancy[cells] = True
+            positions.append((pos_x, pos_y))
+        self._add_pattern_instances(rule, prefab, positions)
+
+    def _add_pattern_instances(self, rule, prefab, positions):
+        """
+        Añade en bloque instancias de un prefab ya validadas.
+        
+        Parámetros:
+        - rule: Regla de generación del patrón
+        - prefab: Prefab compartido del patrón
+        - positions: Lista de posiciones (x, y) locales de la ventana
+        
+        Las posiciones ya tienen la huella marcada en la rejilla de ocupación,
+        que incluye la zona segura, así que no hace falta la variante sin
+        celdas colisionables de _place_pattern.
+        """
+        if not positions:
+            return
+        self.pattern_instances.extend(
+            PatternInstance(prefab, pos_x, pos_y, pos_y + prefab.height - 1) for pos_x, pos_y in positions)
+        self.generated_patterns.extend((rule, position) for position in positions)
+        rows, cols = np.nonzero(prefab.collision_mask)
+        if len(rows):
+            xs, ys = np.array(positions).T
+            self.collidables.update(zip((xs[:, None] + cols + self.origin_x).ravel().tolist(),
+                                        (ys[:, None] + rows + self.origin_y).ravel().tolist()))
 
     def _log_generated_patterns(self):
         print("Patrones generados:")
@@ -339,16 +963,137 @@ class TileMap:
             Mantiene:
             - Cámara centrada en jugador
             - Límites del mapa
+            - Posición cuantizada a píxeles de pantalla enteros
             """
             # Centrar la cámara en el jugador teniendo en cuenta el factor de zoom
             self.camera_x = player_x - (self.settings.screen_width / self.settings.zoom) // 2
             self.camera_y = player_y - (self.settings.screen_height / self.settings.zoom) // 2
             
-            # Limitar la cámara a los bordes del mapa
-            self.camera_x = max(0, min(self.camera_x, 
-                self.settings.map_width * self.settings.tile_size - self.settings.screen_width / self.settings.zoom))
-            self.camera_y = max(0, min(self.camera_y,
-                self.settings.map_height * self.settings.tile_size - self.settings.screen_height / self.settings.zoom))
+            # Limitar la cámara a los bordes del mapa (o de la ventana cargada)
+            left, top, right, bottom = self.pixel_bounds()
+            self.camera_x = max(left, min(self.camera_x,
+                right - self.settings.screen_width / self.settings.zoom))
+            self.camera_y = max(top, min(self.camera_y,
+                bottom - self.settings.screen_height / self.settings.zoom))
+
+            # Cuantizar a píxeles de pantalla enteros para que el fondo desplazado sea exacto
+            self.camera_x = round(self.camera_x * self.settings.zoom) / self.settings.zoom
+            self.camera_y = round(self.camera_y * self.settings.zoom) / self.settings.zoom
+
+    def _build_collision_grid(self, grid=None):
+        """
+        Construye la rejilla de colisiones y su tabla de sumas acumuladas.
+        
+        Parámetros:
+        - grid: Rejilla ya calculada; si es None se rellena a partir de collidables
+        
+        La tabla permite contar los tiles colisionables de cualquier rectángulo
+        de tiles con cuatro accesos, sea cual sea su tamaño.
+        """
+        if grid is not None:
+            self.collision_grid = grid
+        else:
+            self._fill_collision_grid()
+        self.collision_sum = np.zeros((self.settings.map_height + 1, self.settings.map_width + 1), dtype=np.int32)
+        self.collision_sum[1:, 1:] = self.collision_grid.cumsum(axis=0).cumsum(axis=1)
+
+    def _fill_collision_grid(self):
+        """
+        Rellena la rejilla de colisiones con los tiles colisionables de la ventana.
+        """
+        self.collision_grid = np.zeros((self.settings.map_height, self.settings.map_width), dtype=bool)
+        if self.collidables:
+            tiles = np.array(list(self.collidables)) - (self.origin_x, self.origin_y)
+            inside = ((tiles[:, 0] >= 0) & (tiles[:, 0] < self.settings.map_width) &
+                      (tiles[:, 1] >= 0) & (tiles[:, 1] < self.settings.map_height))
+            tiles = tiles[inside]
+            self.collision_grid[tiles[:, 1], tiles[:, 0]] = True
+
+    def _build_minimap_surface(self):
+        """
+        Construye la imagen reducida del terreno para el minimapa.
+        
+        Cada tile es un píxel con el color medio de su tile base, mezclado con
+        el de las decoraciones según su opacidad. Los tiles colisionables se
+        pintan con minimap_collidable_color.
+        """
+        colors = self.atlas.average_colors()
+        terrain = colors[self.base_layer, :3]
+        for layer in self.decoration_layers:
+            layer_colors = colors[layer]
+            opacity = layer_colors[..., 3:]
+            terrain = terrain * (1 - opacity) + layer_colors[..., :3] * opacity
+        terrain[self.collision_grid] = self.settings.minimap_collidable_color
+        # surfarray usa el orden (x, y)
+        self.minimap_surface = pygame.surfarray.make_surface(terrain.astype(np.uint8).transpose(1, 0, 2))
+
+    def check_collisions(self, xs, ys, widths, heights) -> np.ndarray:
+        """
+        Verifica colisiones de muchos rectángulos a la vez.
+        
+        Parámetros:
+        - xs, ys: Arrays con la esquina superior izquierda de cada rectángulo
+        - widths, heights: Arrays (o escalares) con el tamaño de cada rectángulo
+        
+        Retorna:
+        - Array booleano, True donde el rectángulo toca un tile colisionable
+        
+        Equivale a llamar a check_collision con cada rectángulo.
+        """
+        tile_size = self.settings.tile_size
+        xs = np.asarray(xs, dtype=np.int64) - self.origin_x * tile_size
+        ys = np.asarray(ys, dtype=np.int64) - self.origin_y * tile_size
+        widths = np.asarray(widths, dtype=np.int64)
+        heights = np.asarray(heights, dtype=np.int64)
+
+        tile_x1 = np.maximum(0, xs // tile_size)
+        tile_x2 = np.minimum(self.settings.map_width - 1, (xs + widths - 1) // tile_size)
+        tile_y1 = np.maximum(0, ys // tile_size)
+        tile_y2 = np.minimum(self.settings.map_height - 1, (ys + heights - 1) // tile_size)
+        valid = (tile_x1 <= tile_x2) & (tile_y1 <= tile_y2) & (widths > 0) & (heights > 0)
+
+        # Recortar para indexar sin salirse; los inválidos se descartan con la máscara
+        tile_x1 = np.clip(tile_x1, 0, self.settings.map_width - 1)
+        tile_x2 = np.clip(tile_x2, 0, self.settings.map_width - 1)
+        tile_y1 = np.clip(tile_y1, 0, self.settings.map_height - 1)
+        tile_y2 = np.clip(tile_y2, 0, self.settings.map_height - 1)
+        table = self.collision_sum
+        counts = (table[tile_y2 + 1, tile_x2 + 1] - table[tile_y1, tile_x2 + 1]
+                  - table[tile_y2 + 1, tile_x1] + table[tile_y1, tile_x1])
+        return valid & (counts > 0)
+
+    def resolve_moves(self, old_xs, old_ys, new_xs, new_ys, widths, heights):
+        """
+        Valida en lote los movimientos propuestos y desliza por ejes los bloqueados.
+        
+        Parámetros:
+        - old_xs, old_ys: Arrays con la posición actual (esquina superior izquierda)
+        - new_xs, new_ys: Arrays con la posición propuesta
+        - widths, heights: Arrays (o escalares) con el tamaño de cada hitbox
+        
+        Retorna:
+        - Tupla (xs, ys, blocked):
+        * xs, ys: Posiciones corregidas (movimiento completo, solo en X, solo en Y o sin mover)
+        * blocked: Array booleano, True donde el movimiento completo chocaba
+        """
+        old_xs = np.asarray(old_xs)
+        old_ys = np.asarray(old_ys)
+        new_xs = np.asarray(new_xs)
+        new_ys = np.asarray(new_ys)
+
+        blocked = self.check_collisions(new_xs, new_ys, widths, heights)
+        xs = new_xs.copy()
+        ys = new_ys.copy()
+        if blocked.any():
+            # Intentar deslizar solo en X y, si no, solo en Y
+            slide_x_ok = ~self.check_collisions(new_xs, old_ys, widths, heights)
+            slide_y_ok = ~self.check_collisions(old_xs, new_ys, widths, heights)
+            use_x = blocked & slide_x_ok
+            use_y = blocked & ~slide_x_ok & slide_y_ok
+            stay = blocked & ~slide_x_ok & ~slide_y_ok
+            ys = np.where(use_x | stay, old_ys, ys)
+            xs = np.where(use_y | stay, old_xs, xs)
+        return xs, ys, blocked
 
     def check_collision(self, rect: pygame.Rect) -> bool:
         """
@@ -361,10 +1106,10 @@ class TileMap:
         - True si hay colisión
         - False si no hay colisión
         """
-        tile_x1 = max(0, rect.left // self.settings.tile_size)
-        tile_x2 = min(self.settings.map_width - 1, rect.right // self.settings.tile_size)
-        tile_y1 = max(0, rect.top // self.settings.tile_size)
-        tile_y2 = min(self.settings.map_height - 1, rect.bottom // self.settings.tile_size)
+        tile_x1 = max(self.origin_x, rect.left // self.settings.tile_size)
+        tile_x2 = min(self.origin_x + self.settings.map_width - 1, rect.right // self.settings.tile_size)
+        tile_y1 = max(self.origin_y, rect.top // self.settings.tile_size)
+        tile_y2 = min(self.origin_y + self.settings.map_height - 1, rect.bottom // self.settings.tile_size)
 
         for y in range(tile_y1, tile_y2 + 1):
             for x in range(tile_x1, tile_x2 + 1):
@@ -379,6 +1124,207 @@ class TileMap:
                         return True
         return False
 
+    def clear_line_of_sight_cache(self):
+        """
+        Vacía la caché de línea de visión. Se llama una vez por frame.
+        """
+        self.line_of_sight_cache.clear()
+
+    def has_line_of_sight(self, start, end) -> bool:
+        """
+        Verifica si hay línea de visión entre dos posiciones del mundo.
+        
+        Parámetros:
+        - start: Posición (x, y) de origen en píxeles
+        - end: Posición (x, y) de destino en píxeles
+        
+        Retorna:
+        - True si ningún tile colisionable bloquea el segmento
+        - False si algún tile colisionable lo bloquea
+        
+        Recorre la rejilla de colisiones con Bresenham entre los tiles de
+        origen y destino. El resultado se guarda por par de tiles durante el frame.
+        """
+        x0 = int(start[0] // self.settings.tile_size)
+        y0 = int(start[1] // self.settings.tile_size)
+        x1 = int(end[0] // self.settings.tile_size)
+        y1 = int(end[1] // self.settings.tile_size)
+
+        key = (x0, y0, x1, y1)
+        if key in self.line_of_sight_cache:
+            return self.line_of_sight_cache[key]
+
+        visible = True
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        step_x = 1 if x0 < x1 else -1
+        step_y = 1 if y0 < y1 else -1
+        error = dx + dy
+        x, y = x0, y0
+        while True:
+            if (x, y) in self.collidables:
+                visible = False
+                break
+            if x == x1 and y == y1:
+                break
+            doubled = 2 * error
+            if doubled >= dy:
+                error += dy
+                x += step_x
+            if doubled <= dx:
+                error += dx
+                y += step_y
+
+        self.line_of_sight_cache[key] = visible
+        return visible
+
+    def _build_tile_indexes(self):
+        """
+        Construye el índice espacial de los patrones colocados.
+        
+        Los patrones pueden sobresalir de la ventana, así que el índice
+        tiene filas extra para el alto del mayor patrón.
+        """
+        self.pattern_extent = (
+            max((instance.prefab.width for instance in self.pattern_instances), default=1),
+            max((instance.prefab.height for instance in self.pattern_instances), default=1)
+        )
+        self.pattern_index = TileIndex(self.pattern_instances, self.settings.map_height + self.pattern_extent[1])
+
+    def _build_overlay_surfaces(self):
+        """
+        Asigna a cada patrón colocado la superficie con la que se dibuja en la capa overlay.
+        
+        Los tiles colisionables se dibujan opacos. Los no colisionables usan una
+        variante translúcida (overlay_alpha) que cada prefab compone una sola vez
+        por zoom, de forma que el dibujo del overlay no crea superficies.
+        """
+        scaled_tile = int(self.settings.tile_size * self.settings.zoom)
+        for instance in self.pattern_instances:
+            instance.overlay_surface = instance.prefab.overlay(scaled_tile, self.overlay_alpha)
+
+    def set_overlay_alpha(self, alpha):
+        """
+        Cambia la transparencia de los tiles de patrón no colisionables.
+        
+        Parámetros:
+        - alpha: Valor de 0 (invisible) a 255 (opaco)
+        """
+        self.overlay_alpha = alpha
+        self._build_overlay_surfaces()
+
+    def set_zoom(self, zoom):
+        """
+        Cambia el zoom con el que se dibuja el mapa sin regenerarlo.
+        
+        Parámetros:
+        - zoom: Nuevo factor de zoom
+        
+        Los tiles y prefabs de cada zoom se escalan la primera vez que se usan
+        y se conservan en cachés LRU, así que volver a un zoom reciente no
+        escala nada. Los chunks de fondo se guardan por zoom en su propia caché.
+        """
+        self.settings.zoom = zoom
+        self._build_overlay_surfaces()
+
+    def _bake_chunk(self, chunk_x, chunk_y) -> pygame.Surface:
+        """
+        Pre-renderiza la capa base y las decoraciones de un chunk.
+        
+        Parámetros:
+        - chunk_x, chunk_y: Coordenadas del chunk en el mundo
+        
+        Retorna:
+        - Superficie con el chunk dibujado al zoom actual
+        """
+        scaled_tile = int(self.settings.tile_size * self.settings.zoom)
+        x0 = chunk_x * self.chunk_size - self.origin_x
+        y0 = chunk_y * self.chunk_size - self.origin_y
+        x1 = min(x0 + self.chunk_size, self.settings.map_width)
+        y1 = min(y0 + self.chunk_size, self.settings.map_height)
+
+        surface = pygame.Surface(((x1 - x0) * scaled_tile, (y1 - y0) * scaled_tile)).convert()
+        # Cada capa se dibuja entera antes de la siguiente: los tiles de una misma
+        # celda conservan así el orden de las reglas de generación
+        surfaces = self.atlas.scaled(scaled_tile)
+        for layer in [self.base_layer] + self.decoration_layers:
+            block = layer[y0:y1, x0:x1]
+            rows, cols = np.nonzero(block)
+            surface.blits([
+                (surfaces[gid], (col * scaled_tile, row * scaled_tile))
+                for row, col, gid in zip(rows.tolist(), cols.tolist(), block[rows, cols].tolist())
+            ], False)
+        return surface
+
+    def _get_chunk(self, chunk_x, chunk_y) -> pygame.Surface:
+        """
+        Obtiene un chunk pre-renderizado de la caché LRU o lo genera.
+        
+        Parámetros:
+        - chunk_x, chunk_y: Coordenadas del chunk
+        
+        Retorna:
+        - Superficie del chunk
+        
+        Descarta los chunks usados hace más tiempo cuando se supera el
+        presupuesto de memoria (settings.background_chunk_cache_mb).
+        """
+        key = (chunk_x, chunk_y, self.settings.zoom)
+        surface = self.chunk_cache.get(key)
+        if surface is not None:
+            self.chunk_cache.move_to_end(key)
+            return surface
+
+        surface = self._bake_chunk(chunk_x, chunk_y)
+        self.chunk_cache[key] = surface
+        self.chunk_cache_bytes += surface.get_bytesize() * surface.get_width() * surface.get_height()
+        while self.chunk_cache_bytes > self.chunk_cache_budget and len(self.chunk_cache) > 1:
+            _, evicted = self.chunk_cache.popitem(last=False)
+            self.chunk_cache_bytes -= evicted.get_bytesize() * evicted.get_width() * evicted.get_height()
+        return surface
+
+    def _draw_chunks(self, surface, area, camera_px):
+        """
+        Dibuja los chunks que cubren una región de la pantalla.
+        
+        Parámetros:
+        - surface: Superficie donde dibujar (alineada con la pantalla)
+        - area: pygame.Rect en coordenadas de pantalla a redibujar
+        - camera_px: Tupla (x, y) con la cámara en píxeles de pantalla
+        
+        Limita el dibujo a la región con un clip, de modo que solo se
+        copian los píxeles expuestos.
+        """
+        scaled_chunk = int(self.chunk_size * self.settings.tile_size * self.settings.zoom)
+        origin_chunk_x = self.origin_x // self.chunk_size
+        origin_chunk_y = self.origin_y // self.chunk_size
+        start_x = max(origin_chunk_x, (camera_px[0] + area.left) // scaled_chunk)
+        start_y = max(origin_chunk_y, (camera_px[1] + area.top) // scaled_chunk)
+        end_x = min(origin_chunk_x + (self.settings.map_width - 1) // self.chunk_size,
+                (camera_px[0] + area.right - 1) // scaled_chunk)
+        end_y = min(origin_chunk_y + (self.settings.map_height - 1) // self.chunk_size,
+                (camera_px[1] + area.bottom - 1) // scaled_chunk)
+
+        surface.set_clip(area)
+        surface.fill((0, 0, 0), area)
+        surface.blits([
+            (self._get_chunk(chunk_x, chunk_y),
+             (chunk_x * scaled_chunk - camera_px[0], chunk_y * scaled_chunk - camera_px[1]))
+            for chunk_y in range(start_y, end_y + 1)
+            for chunk_x in range(start_x, end_x + 1)
+        ], False)
+        surface.set_clip(None)
+
+    def prebake_start_view(self):
+        """
+        Pre-renderiza los chunks y el buffer de fondo de la vista inicial del jugador.
+        
+        Permite dejar el mapa listo para el primer frame cuando se genera
+        fuera del bucle de juego (por ejemplo, en segundo plano).
+        """
+        tile_size = self.settings.tile_size
+        self.update_camera(self.player_start_pos[0] * tile_size, self.player_start_pos[1] * tile_size)
+        self.draw_background_layers(pygame.Surface((self.settings.screen_width, self.settings.screen_height)))
 
     def draw_background_layers(self, screen):
         """
@@ -387,78 +1333,71 @@ class TileMap:
         Parámetros:
         - screen: Superficie donde dibujar
         
-        Dibuja en orden:
-        1. Capa base (terreno)
-        2. Capa de decoración
+        Usa un buffer alineado con la cámara: desplaza el contenido del frame
+        anterior según el movimiento de la cámara y solo redibuja las franjas
+        recién expuestas a partir de los chunks pre-renderizados. El coste
+        depende de la velocidad de la cámara, no del área de pantalla.
         """
         try:
-            # Calcula el área visible
-            start_x = max(0, int(self.camera_x // self.settings.tile_size))
-            start_y = max(0, int(self.camera_y // self.settings.tile_size))
-            end_x = min(self.settings.map_width, 
-                    int((self.camera_x + self.settings.screen_width) // self.settings.tile_size + 1))
-            end_y = min(self.settings.map_height,
-                    int((self.camera_y + self.settings.screen_height) // self.settings.tile_size + 1))
-            
-            # Dibuja la capa base
-            for y in range(start_y, end_y):
-                for x in range(start_x, end_x):
-                    if self.base_layer[y][x]:
-                        screen_x = (x * self.settings.tile_size - self.camera_x) * self.settings.zoom
-                        screen_y = (y * self.settings.tile_size - self.camera_y) * self.settings.zoom
-                        screen.blit(self.base_layer[y][x], (screen_x, screen_y))
-            
-            # Dibuja solo la capa de decoración (excluyendo props)
-            visible_decorations = [
-                tile for tile in self.medium_layer 
-                if start_x <= tile.x < end_x and 
-                start_y <= tile.y < end_y and 
-                not tile.is_pattern  # Excluye los props
-            ]
-            
-            # Ordena por coordenada Y
-            visible_decorations.sort(key=lambda t: t.y)
-            
-            # Dibuja las decoraciones
-            for tile in visible_decorations:
-                screen_x = (tile.x * self.settings.tile_size - self.camera_x) * self.settings.zoom
-                screen_y = (tile.y * self.settings.tile_size - self.camera_y) * self.settings.zoom
-                screen.blit(tile.surface, (screen_x, screen_y))
+            size = screen.get_size()
+            camera_px = (round(self.camera_x * self.settings.zoom), round(self.camera_y * self.settings.zoom))
 
-        except Exception as e:
-            print(f"Error dibujando capas de fondo: {e}")
+            if self.background_buffer is None or self.background_buffer.get_size() != size:
+                self.background_buffer = pygame.Surface(size).convert()
+                self.background_buffer_camera = None
 
+            buffer = self.background_buffer
+            previous = self.background_buffer_camera
+            if previous is None or self.background_buffer_zoom != self.settings.zoom:
+                self._draw_chunks(buffer, buffer.get_rect(), camera_px)
+            else:
+                dx = camera_px[0] - previous[0]
+                dy = camera_px[1] - previous[1]
+                if abs(dx) >= size[0] or abs(dy) >= size[1]:
+                    self._draw_chunks(buffer, buffer.get_rect(), camera_px)
+                elif dx or dy:
+                    buffer.scroll(-dx, -dy)
+                    # Columnas expuestas
+                    if dx > 0:
+                        self._draw_chunks(buffer, pygame.Rect(size[0] - dx, 0, dx, size[1]), camera_px)
+                    elif dx < 0:
+                        self._draw_chunks(buffer, pygame.Rect(0, 0, -dx, size[1]), camera_px)
+                    # Filas expuestas
+                    if dy > 0:
+                        self._draw_chunks(buffer, pygame.Rect(0, size[1] - dy, size[0], dy), camera_px)
+                    elif dy < 0:
+                        self._draw_chunks(buffer, pygame.Rect(0, 0, size[0], -dy), camera_px)
 
+            self.background_buffer_camera = camera_px
+            self.background_buffer_zoom = self.settings.zoom
+            screen.blit(buffer, (0, 0))
 
-    def draw_overlay_layer(self, screen: pygame.Surface):
-        """Dibuja la capa overlay con transparencia"""
-        visible_pattern = [tile for tile in self.pattern_tiles
-                        if self.is_tile_visible(tile)]
+        except Exception as e:
+            print(f"Error dibujando capas de fondo: {e}")
+
+    def submit_props(self, render_queue):
+        """
+        Envía los patrones visibles (capa overlay) a la capa de profundidad de la cola de renderizado.
         
-        visible_pattern.sort(key=lambda t: t.y)  # Ordenar por profundidad
+        Parámetros:
+        - render_queue: RenderQueue del frame
         
-        for tile in visible_pattern:
-            pos = (
-                (tile.x * self.settings.tile_size * self.settings.zoom) - (self.camera_x * self.settings.zoom),
-                (tile.y * self.settings.tile_size * self.settings.zoom) - (self.camera_y * self.settings.zoom)
-            )
-            
-            if tile.collidable:
-                screen.blit(tile.surface, pos)
-            else:
-                # Crear una copia con transparencia para tiles no colisionables
-                surface = tile.surface.copy()
-                surface.set_alpha(128)  # 50% de transparencia
-                screen.blit(surface, pos)
-
-    def is_tile_visible(self, tile):
-        """Comprueba si un tile está en la pantalla"""
-        tile_x = tile.x * self.settings.tile_size * self.settings.zoom
-        tile_y = tile.y * self.settings.tile_size * self.settings.zoom
-        screen_x = self.camera_x * self.settings.zoom
-        screen_y = self.camera_y * self.settings.zoom
-        
-        return (tile_x + self.settings.tile_size >= screen_x and
-                tile_x <= screen_x + self.settings.screen_width and
-                tile_y + self.settings.tile_size >= screen_y and
-                tile_y <= screen_y + self.settings.screen_height)
+        Consulta el índice de patrones con el rango de tiles visible (ampliado
+        con el tamaño del mayor patrón), que devuelve los patrones ya ordenados
+        por profundidad, y los envía como lista estática preordenada: la cola
+        los intercala con las entidades sin reordenarlos. La profundidad de
+        cada patrón es el borde inferior de su última fila, en píxeles del mundo.
+        """
+        tile_size = self.settings.tile_size
+        zoom = self.settings.zoom
+        start_x = int(self.camera_x // tile_size) - self.origin_x
+        start_y = int(self.camera_y // tile_size) - self.origin_y
+        end_x = int((self.camera_x + self.settings.screen_width / zoom) // tile_size) + 1 - self.origin_x
+        end_y = int((self.camera_y + self.settings.screen_height / zoom) // tile_size) + 1 - self.origin_y
+        extent_x, extent_y = self.pattern_extent
+        
+        render_queue.submit_static([
+            ((instance.depth + 1 + self.origin_y) * tile_size, instance.overlay_surface,
+             (instance.x + self.origin_x) * tile_size, (instance.y + self.origin_y) * tile_size)
+            for instance in self.pattern_index.query(start_x - extent_x + 1, start_y, end_x, end_y + extent_y - 1)
+        ])